@@ -5,6 +5,7 @@ from langchain_core.output_parsers import StrOutputParser
 from dotenv import load_dotenv
 
 from agents.linkedin_lookup_agent import lookup
+from caching.llm import llm_cache
 from third_parties.linkedin import scrape_linkedin_profile
 # import os
 # import getpass
@@ -22,7 +23,7 @@ def ice_break_with(name: str) -> str:
         input_variables=["information"], template=summary_template
     )
     
-    llm = ChatGroq(temperature=0, model_name="mixtral-8x7b-32768")
+    llm = ChatGroq(temperature=0, model_name="mixtral-8x7b-32768", cache=llm_cache())
     
     chain = summary_prompt_template | llm | StrOutputParser()
     
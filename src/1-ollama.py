@@ -3,6 +3,8 @@ from langchain_ollama.llms import OllamaLLM
 from langchain_core.output_parsers import StrOutputParser
 from dotenv import load_dotenv
 
+from caching.llm import llm_cache
+
 def main():
     load_dotenv()
     
@@ -24,7 +26,7 @@ Zuckerberg has used his funds to organize multiple large donations, including th
         input_variables=["information"], template=summary_template
     )
     
-    llm = OllamaLLM(temperature=0, model="gemma3", host="localhost", port=11434)
+    llm = OllamaLLM(temperature=0, model="gemma3", host="localhost", port=11434, cache=llm_cache())
     
     chain = summary_prompt_template | llm | StrOutputParser()
     
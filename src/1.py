@@ -1,6 +1,8 @@
 from langchain_core.prompts import PromptTemplate
 from langchain_groq import ChatGroq
 from dotenv import load_dotenv
+
+from caching.llm import llm_cache
 # import os
 # import getpass
 
@@ -31,7 +33,7 @@ In October 2002, eBay acquired PayPal for $1.5 billion, and that same year, with
         input_variables=["information"], template=summary_template
     )
     
-    llm = ChatGroq(temperature=0, model_name="mixtral-8x7b-32768")
+    llm = ChatGroq(temperature=0, model_name="mixtral-8x7b-32768", cache=llm_cache())
     
     chain = summary_prompt_template | llm
     
@@ -1,4 +1,5 @@
 import os
+import sys
 from dotenv import load_dotenv
 
 from langchain_groq import ChatGroq
@@ -8,10 +9,15 @@ from langchain.agents import (
     create_react_agent,
     AgentExecutor,
 )
-from langchain import hub
 # from tools.tools import get_profile_url_tavily
 from langchain_community.tools.tavily_search import TavilySearchResults
 
+# Make the shared modules under src/ importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from caching.llm import llm_cache
+from prompts.registry import load_prompt
+
 load_dotenv()
 
 def get_profile_url_tavily(name: str):
@@ -24,7 +30,8 @@ def get_profile_url_tavily(name: str):
 def lookup(name: str) -> str:
     llm = ChatGroq(
         temperature=0,
-        model_name="llama-3.3-70b-versatile"
+        model_name="llama-3.3-70b-versatile",
+        cache=llm_cache(),
     )
     
     template = """given the full name {name_of_person} I want you to get it me a link to their Linkedin profile page.
@@ -42,7 +49,7 @@ def lookup(name: str) -> str:
         )
     ]
     
-    react_prompt = hub.pull("hwchase17/react")
+    react_prompt = load_prompt("hwchase17/react")
     agent = create_react_agent(llm=llm, tools=tools_for_agent, prompt=react_prompt)
     agentExecutor = AgentExecutor(agent=agent, tools=tools_for_agent, verbose=True)
     
@@ -0,0 +1,112 @@
+"""Request-path cost of the agent tracing callbacks.
+
+Calls the LLM start/end hooks directly with a synthetic multi-KB prompt and
+response, --calls times, and reports the time spent inside them: with no
+handler, with a handler that prints like the old ``AgentCallbackHandler``
+(to /dev/null, so the terminal is not measured) and with the queued
+``AgentCallbackHandler``, then reports what the writer recorded.
+
+    python src/benchmarks/callback_overhead.py
+    python src/benchmarks/callback_overhead.py --calls 20000 --prompt-chars 8000 --sample-rate 0.1
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+from langchain.callbacks.base import BaseCallbackHandler
+from langchain.schema import Generation, LLMResult
+
+# Make the ReAct agent modules importable
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "react_agents"))
+
+from callbacks import AgentCallbackHandler, TraceWriter
+
+
+class PrintingHandler(BaseCallbackHandler):
+    """What the agent used before: prints the whole prompt and response."""
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        print(f"***Prompt to LLM was:***\n{prompts[0]}")
+        print("*********")
+
+    def on_llm_end(self, response, **kwargs):
+        print(f"***LLM Response:***\n{response.generations[0][0].text}")
+        print("*********")
+
+
+def run_hooks(handler, calls: int, prompt: str, response: LLMResult) -> float:
+    """Seconds spent in the hooks over ``calls`` LLM calls."""
+    params = {"invocation_params": {"model_name": "benchmark"}}
+    elapsed = 0.0
+    for _ in range(calls):
+        run_id = uuid.uuid4()
+        start = time.perf_counter()
+        if handler is not None:
+            handler.on_llm_start({}, [prompt], run_id=run_id, **params)
+            handler.on_llm_end(response, run_id=run_id)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--prompt-chars", type=int, default=4000)
+    parser.add_argument("--sample-rate", type=float, default=1.0)
+    parser.add_argument("--output", default="callback_overhead.json")
+    args = parser.parse_args()
+
+    prompt = ("Thought: I should look this up.\nObservation: " * args.prompt_chars)[:args.prompt_chars]
+    response = LLMResult(
+        generations=[[Generation(text="Action: get_text_length\nAction Input: DOG")]],
+        llm_output={"token_usage": {"prompt_tokens": args.prompt_chars // 4, "completion_tokens": 12}},
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        trace_path = os.path.join(tmp, "traces.jsonl")
+        writer = TraceWriter(trace_path, max_queue=args.calls)
+        queued = AgentCallbackHandler(writer, sample_rate=args.sample_rate)
+
+        results = []
+        for name, handler in [("none", None), ("print", PrintingHandler()), ("queued", queued)]:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                elapsed = run_hooks(handler, args.calls, prompt, response)
+            results.append({"handler": name, "us_per_call": elapsed / args.calls * 1e6})
+
+        writer.close()
+        stats = queued.stats()
+        lines = 0
+        # Not created when nothing was sampled
+        if os.path.exists(trace_path):
+            with open(trace_path, encoding="utf-8") as f:
+                lines = sum(1 for _ in f)
+
+    for result in results:
+        print(f"  {result['handler']}: {result['us_per_call']:.2f}µs per LLM call")
+    print(
+        f"📊 Writer: {stats['calls']} calls recorded, {lines} trace lines, "
+        f"{stats['dropped']} dropped, {stats['prompt_tokens']} prompt tokens"
+    )
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "params": vars(args),
+                "results": results,
+                "writer": stats,
+                "trace_lines": lines,
+            },
+            f,
+            indent=2,
+        )
+    print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from typing import List, Tuple
+import hashlib
+import math
+import random
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+# Small fixed vocabulary so synthetic documents share terms like real docs do
+_VOCABULARY = [
+    "agent", "chain", "retriever", "vector", "store", "embedding", "prompt", "template",
+    "document", "loader", "splitter", "chunk", "query", "index", "collection", "qdrant",
+    "faiss", "memory", "callback", "tool", "output", "parser", "model", "token", "stream",
+    "batch", "async", "cache", "runnable", "message", "history", "context", "answer",
+    "search", "similarity", "score", "metadata", "source", "config", "client", "server",
+    "upsert", "payload", "filter", "limit", "offset", "schema", "json", "api", "python",
+]
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic, model-free embedder for benchmarks.
+
+    Tokens are hashed into ``size`` buckets (the hashing trick) and the result
+    is L2-normalized, so texts sharing words land close together, and the
+    same text always gives the same vector without loading a model.
+    """
+
+    def __init__(self, size: int = 768):
+        self.size = size
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.size
+        for token in text.lower().split():
+            digest = hashlib.md5(token.encode("utf-8")).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.size
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def synthetic_corpus(
+    num_docs: int, num_queries: int, words: int = 80, seed: int = 42
+) -> Tuple[List[Document], List[str]]:
+    """Reproducible documents (with ``doc_id`` metadata) and queries.
+
+    Each query is a random slice of a random document, so it has clear
+    nearest neighbours without being an exact copy.
+    """
+    rng = random.Random(seed)
+    documents = [
+        Document(
+            page_content=" ".join(rng.choice(_VOCABULARY) + str(rng.randint(0, 200)) for _ in range(words)),
+            metadata={"doc_id": i},
+        )
+        for i in range(num_docs)
+    ]
+    queries = []
+    for _ in range(num_queries):
+        tokens = rng.choice(documents).page_content.split()
+        start = rng.randint(0, len(tokens) - 10)
+        queries.append(" ".join(tokens[start:start + rng.randint(5, 10)]))
+    return documents, queries
@@ -0,0 +1,126 @@
+"""Accuracy and throughput of the embedding backends (torch, onnx, onnx-int8).
+
+Each backend embeds the same texts in its own process on CPU, so load time,
+throughput and peak RSS are measured independently. Vectors are compared
+with the torch ones by cosine similarity; the run fails if a backend's mean
+agreement falls below --min-cosine.
+
+    python src/benchmarks/embedding_backends.py --texts 2000
+    python src/benchmarks/embedding_backends.py --texts-file chunks.txt --backends torch onnx-int8
+"""
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+
+from corpus import synthetic_corpus
+
+# Make the shared modules under src/ importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run_backend(backend: str, texts, threads: int):
+    """Embeds ``texts`` with one backend; runs inside a fresh process."""
+    from embeddings.cached import load_embeddings
+
+    start = time.perf_counter()
+    embeddings = load_embeddings(device="cpu", cache=False, backend=backend, threads=threads)
+    load_s = time.perf_counter() - start
+
+    # Warm-up so one-off graph/kernel setup is not counted
+    embeddings.embed_documents(texts[:16])
+
+    start = time.perf_counter()
+    vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    elapsed = time.perf_counter() - start
+    return {
+        "backend": backend,
+        "load_s": load_s,
+        "texts_per_s": len(texts) / elapsed,
+        # ru_maxrss is in KB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }, vectors
+
+
+def cosine_agreement(vectors: np.ndarray, reference: np.ndarray) -> dict:
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    cosines = (vectors * reference).sum(axis=1)
+    return {
+        "cosine_mean": float(cosines.mean()),
+        "cosine_p1": float(np.percentile(cosines, 1)),
+        "cosine_min": float(cosines.min()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=2000, help="synthetic texts when no --texts-file")
+    parser.add_argument("--texts-file", help="one text per line, e.g. real docs chunks")
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    parser.add_argument("--output", default="embedding_backends.json")
+    args = parser.parse_args()
+
+    if args.texts_file:
+        with open(args.texts_file, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+    else:
+        documents, _ = synthetic_corpus(args.texts, 0)
+        texts = [doc.page_content for doc in documents]
+    print(f"📊 {len(texts)} texts, {args.threads} thread(s)")
+
+    results, vectors = [], {}
+    for backend in args.backends:
+        print(f"⏳ Benchmarking {backend}...")
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            try:
+                result, vectors[backend] = pool.submit(run_backend, backend, texts, args.threads).result()
+            except Exception as e:
+                print(f"⚠ Skipping {backend}: {e}")
+                continue
+        results.append(result)
+
+    reference = vectors.get("torch")
+    failed = []
+    for result in results:
+        if reference is not None:
+            result.update(cosine_agreement(vectors[result["backend"]], reference))
+            if result["cosine_mean"] < args.min_cosine:
+                failed.append(result["backend"])
+        baseline = results[0]["texts_per_s"]
+        print(
+            f"  {result['backend']}: {result['texts_per_s']:.1f} texts/s "
+            f"({result['texts_per_s'] / baseline:.2f}x) load={result['load_s']:.1f}s "
+            f"rss={result['peak_rss_mb']:.0f}MB"
+            + (f" cosine mean={result['cosine_mean']:.4f} min={result['cosine_min']:.4f}"
+               if "cosine_mean" in result else "")
+        )
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "params": vars(args),
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+    print(f"✅ Results written to {args.output}")
+
+    if failed:
+        print(f"❌ Cosine agreement below {args.min_cosine}: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Recall and query speed of the in-memory store's FAISS index types.
+
+Builds every index type from vectors-in-memory/index_factory.py on a
+reproducible clustered corpus and sweeps nprobe (IVF) / efSearch (HNSW),
+reporting recall@k against the exact flat index:
+
+    python src/benchmarks/faiss_index.py --vectors 200000 --dim 768 --k 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import faiss
+import numpy as np
+
+# Make vectors-in-memory/ importable
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "vectors-in-memory"))
+
+from index_factory import INDEX_TYPES, build_index, recall_at_k, set_search_params
+
+SWEEPS = {
+    "flat": [("-", None)],
+    "ivf-flat": [("nprobe", n) for n in (1, 4, 8, 16, 32, 64)],
+    "ivf-pq": [("nprobe", n) for n in (1, 4, 8, 16, 32, 64)],
+    "hnsw": [("efSearch", n) for n in (16, 32, 64, 128, 256)],
+}
+
+
+def clustered_vectors(count: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    """Gaussian blobs around random centres, loosely like sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim)).astype("float32")
+    labels = rng.integers(0, clusters, size=count)
+    vectors = centres[labels] + rng.normal(scale=0.5, size=(count, dim)).astype("float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--train-size", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="faiss_index_results.json")
+    args = parser.parse_args()
+
+    data = clustered_vectors(args.vectors + args.queries, args.dim, clusters=256, seed=args.seed)
+    queries, corpus = data[:args.queries], data[args.queries:]
+    exact = build_index("flat", args.dim)
+    exact.add(corpus)
+    print(f"📊 {len(corpus)} vectors, {len(queries)} queries, dim={args.dim}, k={args.k}")
+
+    results = []
+    for index_type in INDEX_TYPES:
+        start = time.perf_counter()
+        index = build_index(index_type, args.dim, train_vectors=corpus[:args.train_size])
+        index.add(corpus)
+        build_seconds = time.perf_counter() - start
+
+        for param, value in SWEEPS[index_type]:
+            set_search_params(
+                index,
+                nprobe=value if param == "nprobe" else None,
+                ef_search=value if param == "efSearch" else None,
+            )
+            start = time.perf_counter()
+            for query in queries:
+                index.search(query.reshape(1, -1), args.k)
+            ms_per_query = (time.perf_counter() - start) / len(queries) * 1000
+
+            result = {
+                "index": index_type,
+                "param": param,
+                "value": value,
+                "recall_at_k": recall_at_k(index, exact, queries, args.k),
+                "ms_per_query": ms_per_query,
+                "build_s": build_seconds,
+                "index_mb": faiss.serialize_index(index).nbytes / 1024 ** 2,
+            }
+            print(
+                f"  {index_type:8} {param}={value}: recall@{args.k}={result['recall_at_k']:.3f} "
+                f"{ms_per_query:.3f}ms/query, {result['index_mb']:.0f}MB"
+            )
+            results.append(result)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"params": vars(args), "results": results}, f, indent=2)
+    print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
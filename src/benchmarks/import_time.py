@@ -0,0 +1,137 @@
+"""Import-time budget check for the CLI and service entry points.
+
+Imports each entry point in a fresh interpreter with ``-X importtime`` and
+fails if its cumulative import time exceeds --budget-ms, or if it pulls in
+one of the heavy packages that should only load on first use (torch,
+LangChain, qdrant_client, ...). Also times ``--help`` of the CLIs.
+
+    python src/benchmarks/import_time.py
+    python src/benchmarks/import_time.py --budget-ms 300 --top 15
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (directory under src/, module imported by workers and servers)
+ENTRY_POINTS = [
+    ("documentation-helper/services", "core"),
+    ("documentation-helper/services", "server"),
+    ("documentation-helper", "ingrestion"),
+    ("vectors-in-memory", "ingest_pdfs"),
+]
+
+# (directory under src/, script whose --help must be fast)
+CLIS = [
+    ("documentation-helper/services", "server.py"),
+    ("documentation-helper", "ingrestion.py"),
+    ("vectors-in-memory", "ingest_pdfs.py"),
+]
+
+HEAVY_PACKAGES = {
+    "torch", "transformers", "sentence_transformers", "onnxruntime", "faiss",
+    "langchain", "langchain_core", "langchain_community", "langchain_huggingface",
+    "langchain_groq", "langchain_qdrant", "langchain_text_splitters", "qdrant_client",
+}
+
+# "import time:       self [us] |  cumulative | imported package"
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_import(directory: str, module: str):
+    """Returns (cumulative ms of the module, heavy packages imported, slowest imports)."""
+    cwd = os.path.join(SRC_DIR, directory)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+        raise RuntimeError(error)
+
+    total_us = 0
+    heavy = set()
+    # Imports since the last top-level one; the module's own line closes its block
+    block = []
+    slowest = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        if name.split(".")[0] in HEAVY_PACKAGES:
+            heavy.add(name.split(".")[0])
+        if indent > 1:
+            block.append((cumulative, name, indent))
+        elif name == module:
+            total_us = cumulative
+            # Direct imports of the module (one level down); deeper ones are in their parents' time
+            slowest = sorted((entry for entry in block if entry[2] == 3), reverse=True)
+        else:
+            block = []
+    return total_us / 1000, heavy, slowest
+
+
+def time_help(directory: str, script: str) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, script, "--help"],
+        cwd=os.path.join(SRC_DIR, directory),
+        capture_output=True,
+        check=True,
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=500, help="max cumulative import time per entry point")
+    parser.add_argument("--help-budget-ms", type=float, default=1000, help="max wall time of `script --help`")
+    parser.add_argument("--top", type=int, default=5, help="slowest imports shown per entry point")
+    args = parser.parse_args()
+
+    failures = []
+    for directory, module in ENTRY_POINTS:
+        name = f"{directory}/{module}"
+        try:
+            total_ms, heavy, slowest = profile_import(directory, module)
+        except RuntimeError as e:
+            print(f"⚠ Could not import {name}: {e}")
+            failures.append(name)
+            continue
+        status = "✅" if total_ms <= args.budget_ms and not heavy else "❌"
+        print(f"{status} import {name}: {total_ms:.0f}ms")
+        for cumulative, imported, _ in slowest[:args.top]:
+            print(f"     {cumulative / 1000:8.1f}ms  {imported}")
+        if heavy:
+            print(f"     heavy packages imported eagerly: {', '.join(sorted(heavy))}")
+        if status == "❌":
+            failures.append(name)
+
+    for directory, script in CLIS:
+        name = f"{directory}/{script} --help"
+        try:
+            elapsed_ms = time_help(directory, script)
+        except subprocess.CalledProcessError:
+            print(f"⚠ {name} failed")
+            failures.append(name)
+            continue
+        status = "✅" if elapsed_ms <= args.help_budget_ms else "❌"
+        print(f"{status} {name}: {elapsed_ms:.0f}ms")
+        if status == "❌":
+            failures.append(name)
+
+    if failures:
+        print(f"❌ Over budget: {', '.join(failures)}")
+        sys.exit(1)
+    print("✅ All entry points within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Recall/latency/RAM trade-off of the docs collection's quantization options.
+
+Samples vectors from an existing collection, rebuilds them into temporary
+collections with each quantization setting and compares their top-k results
+with exact float32 search. Needs a running Qdrant server.
+
+    python src/benchmarks/quantization.py --sample 20000 --queries 200 --k 10
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+
+# Make documentation-helper/ importable
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "documentation-helper"))
+
+from collection import create_collection, enable_indexing, search_params, wait_until_indexed
+
+# (name, quantization, rescore, originals on disk)
+CONFIGS = [
+    ("float32", None, False, False),
+    ("int8", "int8", False, False),
+    ("int8+rescore", "int8", True, False),
+    ("int8+rescore+on_disk", "int8", True, True),
+    ("binary", "binary", False, False),
+    ("binary+rescore", "binary", True, False),
+    ("binary+rescore+on_disk", "binary", True, True),
+]
+
+
+def sample_vectors(client: QdrantClient, collection_name: str, limit: int) -> np.ndarray:
+    vectors = []
+    offset = None
+    while len(vectors) < limit:
+        records, offset = client.scroll(
+            collection_name=collection_name,
+            limit=min(1000, limit - len(vectors)),
+            offset=offset,
+            # Dense vector only; hybrid collections also hold the "bm25" sparse one
+            with_vectors=[""],
+            with_payload=False,
+        )
+        vectors.extend(
+            record.vector[""] if isinstance(record.vector, dict) else record.vector for record in records
+        )
+        if offset is None:
+            break
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Exact cosine top-k ids (row numbers) as ground truth."""
+    corpus = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ corpus.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def ram_bytes(count: int, dim: int, quantization, on_disk: bool) -> int:
+    """Approximate RAM held by vectors (excluding the HNSW graph)."""
+    originals = 0 if on_disk else count * dim * 4
+    quantized = {None: 0, "int8": count * dim, "binary": count * dim // 8}[quantization]
+    return originals + quantized
+
+
+def run_config(client, name, quantization, rescore, on_disk, corpus, queries, truth, k, oversampling):
+    collection_name = f"bench_quantization_{name.replace('+', '_')}"
+    if client.collection_exists(collection_name):
+        client.delete_collection(collection_name)
+
+    create_collection(
+        client, collection_name, corpus.shape[1],
+        bulk=True, quantization=quantization, on_disk=on_disk,
+    )
+    try:
+        for i in range(0, len(corpus), 500):
+            client.upsert(
+                collection_name=collection_name,
+                points=[
+                    PointStruct(id=i + j, vector=vector.tolist())
+                    for j, vector in enumerate(corpus[i:i + 500])
+                ],
+            )
+        enable_indexing(client, collection_name)
+        wait_until_indexed(client, collection_name)
+
+        params = search_params(rescore=rescore, oversampling=oversampling if rescore else 1.0)
+        latencies = []
+        hits = 0
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            result = client.query_points(
+                collection_name=collection_name,
+                query=query.tolist(),
+                limit=k,
+                search_params=params,
+            )
+            latencies.append(time.perf_counter() - start)
+            hits += len({point.id for point in result.points} & set(expected.tolist()))
+    finally:
+        client.delete_collection(collection_name)
+
+    latencies.sort()
+    return {
+        "config": name,
+        "recall_at_k": hits / (len(queries) * k),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "vector_ram_mb": ram_bytes(len(corpus), corpus.shape[1], quantization, on_disk) / 1024 ** 2,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="localhost:6334")
+    parser.add_argument("--collection", default="docs_collection")
+    parser.add_argument("--sample", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--oversampling", type=float, default=2.0)
+    parser.add_argument("--output", default="quantization_results.json")
+    args = parser.parse_args()
+
+    client = QdrantClient(url=args.url, prefer_grpc=True)
+    vectors = sample_vectors(client, args.collection, args.sample + args.queries)
+    if len(vectors) <= args.queries:
+        print(f"❌ Not enough vectors in '{args.collection}' ({len(vectors)})")
+        return
+    queries, corpus = vectors[:args.queries], vectors[args.queries:]
+    print(f"📊 {len(corpus)} vectors, {len(queries)} queries, k={args.k}")
+    truth = exact_top_k(corpus, queries, args.k)
+
+    results = []
+    for name, quantization, rescore, on_disk in CONFIGS:
+        print(f"⏳ Benchmarking {name}...")
+        result = run_config(
+            client, name, quantization, rescore, on_disk,
+            corpus, queries, truth, args.k, args.oversampling,
+        )
+        print(
+            f"  recall@{args.k}={result['recall_at_k']:.3f} p50={result['p50_ms']:.2f}ms "
+            f"p95={result['p95_ms']:.2f}ms vector RAM={result['vector_ram_mb']:.1f}MB"
+        )
+        results.append(result)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"corpus": len(corpus), "queries": len(queries), "k": args.k, "results": results}, f, indent=2)
+    print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
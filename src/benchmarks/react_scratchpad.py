@@ -0,0 +1,156 @@
+"""Prompt construction cost over long ReAct runs.
+
+Replays synthetic runs of --steps Thought/Action/Observation rounds and,
+before every step, builds the prompt the agent would send: once the way
+``react_agents/main.py`` used to (``format_log_to_str`` over all steps plus
+a full ``PromptTemplate`` render) and once with the incremental
+``Scratchpad`` and ``prefix_cached_prompt``. Reports CPU time and the
+characters sent over the run, with and without --max-observation-chars.
+
+    python src/benchmarks/react_scratchpad.py
+    python src/benchmarks/react_scratchpad.py --steps 50 200 500 --observation-chars 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from langchain.agents.format_scratchpad import format_log_to_str
+from langchain.schema import AgentAction
+from langchain_core.prompts import PromptTemplate
+
+# Make the ReAct agent modules importable
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "react_agents"))
+
+from scratchpad import Scratchpad, format_scratchpad, prefix_cached_prompt
+
+TEMPLATE = """
+Answer the following questions as best you can. You have access to the following tools:
+
+{tools}
+
+Use the following format:
+
+Question: the input question you must answer
+Thought: you should always think about what to do
+Action: the action to take, should be one of [{tool_names}]
+Action Input: the input to the action
+Observation: the result of the action
+... (this Thought/Action/Action Input/Observation can repeat N times)
+Thought: I now know the final answer
+Final Answer: the final answer to the original input question
+
+Begin!
+
+Question: {input}
+Thought: {agent_scratchpad}
+"""
+
+TOOL_NAMES = [f"tool_{i}" for i in range(8)]
+TOOLS = "\n".join(f"{name}: Looks things up in source number {i}." * 3 for i, name in enumerate(TOOL_NAMES))
+QUESTION = "What is the combined length of every document mentioned in the release notes?"
+
+
+def synthetic_steps(count: int, observation_chars: int, seed: int = 0):
+    rng = random.Random(seed)
+    words = ["qdrant", "retriever", "chunk", "embedding", "agent", "prompt", "score", "token"]
+    steps = []
+    for i in range(count):
+        tool = rng.choice(TOOL_NAMES)
+        tool_input = " ".join(rng.choices(words, k=4))
+        log = f"I should look this up.\nAction: {tool}\nAction Input: {tool_input}"
+        observation = " ".join(rng.choices(words, k=observation_chars // 7))[:observation_chars]
+        steps.append((AgentAction(tool, tool_input, log), f"{i}: {observation}"))
+    return steps
+
+
+def run_baseline(steps):
+    """Prompt lengths per step as built by format_log_to_str + PromptTemplate."""
+    prompt = PromptTemplate.from_template(TEMPLATE).partial(tools=TOOLS, tool_names=", ".join(TOOL_NAMES))
+    intermediate_steps, sizes = [], []
+    for step in steps:
+        text = prompt.format(input=QUESTION, agent_scratchpad=format_log_to_str(intermediate_steps))
+        sizes.append(len(text))
+        intermediate_steps.append(step)
+    return sizes
+
+
+def run_incremental(steps, max_observation_chars=None):
+    """Prompt lengths per step as built by Scratchpad + prefix_cached_prompt."""
+    prompt = prefix_cached_prompt(TEMPLATE, tools=TOOLS, tool_names=", ".join(TOOL_NAMES))
+    intermediate_steps, sizes = Scratchpad(max_observation_chars=max_observation_chars), []
+    for step in steps:
+        text = prompt.invoke({"input": QUESTION, "agent_scratchpad": format_scratchpad(intermediate_steps)}).text
+        sizes.append(len(text))
+        intermediate_steps.append(step)
+    return sizes
+
+
+def measure(name: str, func, *args, repeat: int = 3) -> dict:
+    best = None
+    for _ in range(repeat):
+        start = time.process_time()
+        sizes = func(*args)
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        "variant": name,
+        "cpu_ms": best * 1000,
+        "cpu_ms_per_step": best * 1000 / len(sizes),
+        "prompt_chars_total": sum(sizes),
+        "prompt_chars_last": sizes[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, nargs="+", default=[50, 200, 500], help="run lengths to replay")
+    parser.add_argument("--observation-chars", type=int, default=500, help="length of each observation")
+    parser.add_argument("--max-observation-chars", type=int, default=200, help="cap for the truncated variant")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per variant, best CPU time is kept")
+    parser.add_argument("--output", default="react_scratchpad.json")
+    args = parser.parse_args()
+
+    results = []
+    for count in args.steps:
+        steps = synthetic_steps(count, args.observation_chars)
+
+        # Same prompts, so the comparison is like for like
+        if run_baseline(steps) != run_incremental(steps):
+            print(f"❌ Incremental prompt differs from the baseline at {count} steps")
+            sys.exit(1)
+
+        variants = [
+            measure("baseline", run_baseline, steps, repeat=args.repeat),
+            measure("incremental", run_incremental, steps, repeat=args.repeat),
+            measure("incremental+truncate", run_incremental, steps, args.max_observation_chars, repeat=args.repeat),
+        ]
+        print(f"📊 {count} steps")
+        baseline = variants[0]
+        for variant in variants:
+            variant["steps"] = count
+            print(
+                f"  {variant['variant']}: {variant['cpu_ms']:.1f}ms CPU "
+                f"({baseline['cpu_ms'] / max(variant['cpu_ms'], 1e-9):.1f}x), "
+                f"{variant['prompt_chars_total']:,} prompt chars "
+                f"(~{variant['prompt_chars_total'] // 4:,} tokens), last prompt {variant['prompt_chars_last']:,}"
+            )
+        results.extend(variants)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "params": vars(args),
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+    print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""Offline retrieval benchmark for the project's vector store paths.
+
+Runs the same synthetic corpus and deterministic embedder through:
+  qdrant-memory  QdrantVectorStore on QdrantClient(":memory:")
+  qdrant-server  QdrantVectorStore over gRPC, the service path before batching (skipped if unreachable)
+  qdrant-batch   QdrantBatchRetriever over gRPC, as in services/core.py: micro-batched
+                 invoke per query, plus search_batch throughput (skipped if unreachable)
+  faiss          FAISS.from_documents, as in vectors-in-memory/main.py
+
+and writes ingest throughput, p50/p95/p99 query latency, QPS under
+concurrency and recall@k (against exact search) to JSON:
+
+    python src/benchmarks/retrieval_bench.py --docs 5000 --queries 500
+    python src/benchmarks/retrieval_bench.py --baseline retrieval_bench.json   # compare with an earlier run
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# Make the shared modules under src/ importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import HashingEmbeddings, synthetic_corpus
+
+COLLECTION_NAME = "bench_retrieval"
+
+
+def percentile(sorted_values, p: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def exact_top_k(embeddings, documents, queries, k: int):
+    corpus = np.asarray(embeddings.embed_documents([doc.page_content for doc in documents]))
+    query_vectors = np.asarray(embeddings.embed_documents(queries))
+    scores = query_vectors @ corpus.T
+    return [set(row.tolist()) for row in np.argsort(-scores, axis=1)[:, :k]]
+
+
+def build_qdrant_memory(documents, embeddings):
+    from langchain_qdrant import QdrantVectorStore
+
+    return QdrantVectorStore.from_documents(
+        documents, embeddings, location=":memory:", collection_name=COLLECTION_NAME
+    )
+
+
+def build_qdrant_server(documents, embeddings, url: str):
+    from langchain_qdrant import QdrantVectorStore
+
+    return QdrantVectorStore.from_documents(
+        documents, embeddings, url=url, prefer_grpc=True,
+        collection_name=COLLECTION_NAME, force_recreate=True,
+    )
+
+
+class BatchRetrieverStore:
+    """``similarity_search`` on top of ``QdrantBatchRetriever``, for ``benchmark``."""
+
+    def __init__(self, retriever):
+        self.retriever = retriever
+
+    def similarity_search(self, query: str, k: int):
+        return self.retriever.invoke(query, k)
+
+    def search_batch(self, queries, k: int):
+        return self.retriever.search_batch(queries, k)
+
+
+def build_qdrant_batch(documents, embeddings, url: str):
+    from qdrant_client import QdrantClient, models
+    from retrieval.qdrant_batch import QdrantBatchRetriever
+
+    client = QdrantClient(url=url, prefer_grpc=True)
+    if client.collection_exists(COLLECTION_NAME):
+        client.delete_collection(COLLECTION_NAME)
+    client.create_collection(
+        COLLECTION_NAME,
+        vectors_config=models.VectorParams(size=embeddings.size, distance=models.Distance.COSINE),
+    )
+    # Same {"text", ...metadata} payload layout as the docs ingestion
+    for start in range(0, len(documents), 500):
+        batch = documents[start:start + 500]
+        vectors = embeddings.embed_documents([doc.page_content for doc in batch])
+        client.upsert(
+            collection_name=COLLECTION_NAME,
+            points=[
+                models.PointStruct(id=start + i, vector=vector, payload={"text": doc.page_content, **doc.metadata})
+                for i, (doc, vector) in enumerate(zip(batch, vectors))
+            ],
+            wait=True,
+        )
+    return BatchRetrieverStore(QdrantBatchRetriever(client, COLLECTION_NAME, embeddings))
+
+
+def build_faiss(documents, embeddings):
+    from langchain_community.vectorstores import FAISS
+
+    return FAISS.from_documents(documents, embeddings)
+
+
+def benchmark(name, build, documents, queries, truth, k: int, concurrency: int) -> dict:
+    start = time.perf_counter()
+    store = build()
+    ingest_seconds = time.perf_counter() - start
+
+    def search(query):
+        started = time.perf_counter()
+        results = store.similarity_search(query, k=k)
+        return time.perf_counter() - started, {doc.metadata["doc_id"] for doc in results}
+
+    # Sequential pass: per-query latency and recall
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        latency, found = search(query)
+        latencies.append(latency)
+        hits += len(found & expected)
+    latencies.sort()
+
+    # Concurrent pass: throughput
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(search, queries))
+    concurrent_seconds = time.perf_counter() - start
+
+    extra = {}
+    if hasattr(store, "search_batch"):
+        # Explicit batches, as DocsQAService.retrieve sends them
+        start = time.perf_counter()
+        for i in range(0, len(queries), 64):
+            store.search_batch(queries[i:i + 64], k)
+        extra["batch_qps"] = len(queries) / (time.perf_counter() - start)
+
+    return {
+        "backend": name,
+        "ingest_docs_per_s": len(documents) / ingest_seconds,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "qps": len(queries) / concurrent_seconds,
+        "concurrency": concurrency,
+        "recall_at_k": hits / (len(queries) * k),
+        **extra,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline_path: str):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["backend"]: r for r in json.load(f)["results"]}
+    print(f"\n📉 Change vs {baseline_path}:")
+    for result in results:
+        previous = baseline.get(result["backend"])
+        if not previous:
+            continue
+        changes = ", ".join(
+            f"{metric} {(result[metric] - previous[metric]) / previous[metric] * 100:+.1f}%"
+            for metric in ("p50_ms", "p99_ms", "qps", "batch_qps", "ingest_docs_per_s", "recall_at_k")
+            if previous.get(metric) and metric in result
+        )
+        print(f"  {result['backend']}: {changes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--backends", nargs="+", default=["qdrant-memory", "qdrant-server", "qdrant-batch", "faiss"])
+    parser.add_argument("--qdrant-url", default="localhost:6334")
+    parser.add_argument("--output", default="retrieval_bench.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    embeddings = HashingEmbeddings(size=args.dim)
+    documents, queries = synthetic_corpus(args.docs, args.queries, seed=args.seed)
+    truth = exact_top_k(embeddings, documents, queries, args.k)
+    print(f"📊 {len(documents)} docs, {len(queries)} queries, k={args.k}, dim={args.dim}")
+
+    builders = {
+        "qdrant-memory": lambda: build_qdrant_memory(documents, embeddings),
+        "qdrant-server": lambda: build_qdrant_server(documents, embeddings, args.qdrant_url),
+        "qdrant-batch": lambda: build_qdrant_batch(documents, embeddings, args.qdrant_url),
+        "faiss": lambda: build_faiss(documents, embeddings),
+    }
+
+    results = []
+    for name in args.backends:
+        print(f"⏳ Benchmarking {name}...")
+        try:
+            result = benchmark(name, builders[name], documents, queries, truth, args.k, args.concurrency)
+        except Exception as e:
+            print(f"⚠ Skipping {name}: {e}")
+            continue
+        print(
+            f"  ingest={result['ingest_docs_per_s']:.0f} docs/s p50={result['p50_ms']:.2f}ms "
+            f"p95={result['p95_ms']:.2f}ms p99={result['p99_ms']:.2f}ms "
+            f"qps={result['qps']:.0f} recall@{args.k}={result['recall_at_k']:.3f}"
+            + (f" batch_qps={result['batch_qps']:.0f}" if "batch_qps" in result else "")
+        )
+        results.append(result)
+
+    # Before writing, so the baseline can be the previous run's default output file
+    if args.baseline:
+        compare(results, args.baseline)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "commit": git_commit(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "params": vars(args),
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+    print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+import hashlib
+import os
+import sqlite3
+import threading
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+DEFAULT_PATH = os.getenv(
+    "LLM_CACHE_PATH", str(Path(__file__).resolve().parents[1] / ".llm_cache.sqlite")
+)
+DEFAULT_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "1024"))
+
+
+class TieredLLMCache(BaseCache):
+    """Exact-match LLM response cache: in-memory LRU in front of SQLite.
+
+    LangChain passes each call's prompt and an ``llm_string`` describing the
+    model and its parameters (model name, temperature, stop words, ...); the
+    key is the hash of both, so only identical calls share an entry. Meant
+    for deterministic (``temperature=0``) models; opt in per instance with
+    ``ChatGroq(..., cache=llm_cache())``.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, max_memory_entries: int = DEFAULT_MEMORY_ENTRIES):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self._memory: "OrderedDict[str, RETURN_VAL_TYPE]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, llm_string TEXT, generations TEXT)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, value: RETURN_VAL_TYPE):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value
+
+            row = self._db.execute(
+                "SELECT generations FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            try:
+                value = [loads(generation) for generation in loads(row[0])]
+            except Exception as e:
+                print(f"⚠ Dropping unreadable LLM cache entry: {e}")
+                self.misses += 1
+                return None
+            self._remember(key, value)
+            self.disk_hits += 1
+            return value
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE):
+        key = self._key(prompt, llm_string)
+        generations = dumps([dumps(generation) for generation in return_val])
+        with self._lock:
+            self._remember(key, return_val)
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, llm_string, generations) VALUES (?, ?, ?)",
+                (key, llm_string, generations),
+            )
+            self._db.commit()
+
+    def clear(self, **kwargs: Any):
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM llm_cache")
+            self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+
+@lru_cache(maxsize=None)
+def _shared_cache(path: str) -> TieredLLMCache:
+    return TieredLLMCache(path)
+
+
+def llm_cache(path: str = DEFAULT_PATH) -> Optional[TieredLLMCache]:
+    """Process-wide cache to pass as ``cache=``; ``None`` when ``LLM_CACHE=0``."""
+    if os.getenv("LLM_CACHE", "1") == "0":
+        return None
+    return _shared_cache(path)
@@ -0,0 +1,156 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import itertools
+import json
+import os
+import threading
+import time
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import Runnable, RunnableLambda
+
+
+class SemanticCache:
+    """Answers near-identical questions from earlier retrieval QA results.
+
+    Queries are embedded and compared (cosine) against cached queries; the
+    best match at or above ``threshold`` is a hit and its answer and source
+    documents are returned without retrieval or an LLM call. Entries expire
+    after ``ttl`` seconds and the least recently used one is evicted past
+    ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        threshold: float = 0.95,
+        ttl: Optional[float] = 3600,
+        max_entries: int = 1000,
+        path: Optional[str] = None,
+    ):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        # id -> (normalized query vector, query, result, created_at), oldest use first
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def _vector(self, query: str) -> np.ndarray:
+        vector = np.asarray(self.embeddings.embed_query(query), dtype="float32")
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def _expire(self, now: float):
+        if self.ttl is None:
+            return
+        expired = [key for key, entry in self._entries.items() if now - entry[3] > self.ttl]
+        for key in expired:
+            del self._entries[key]
+        self.expirations += len(expired)
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        vector = self._vector(query)
+        with self._lock:
+            self._expire(time.time())
+            if self._entries:
+                keys = list(self._entries)
+                similarities = np.stack([self._entries[key][0] for key in keys]) @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    self._entries.move_to_end(keys[best])
+                    self.hits += 1
+                    result = self._entries[keys[best]][2]
+                    return {**result, "input": query, "cached_similarity": float(similarities[best])}
+            self.misses += 1
+            return None
+
+    def update(self, query: str, result: Dict[str, Any]):
+        vector = self._vector(query)
+        # Only keep what callers read back; drop anything not serializable
+        cached = {"answer": result.get("answer"), "context": list(result.get("context", []))}
+        with self._lock:
+            self._entries[next(self._ids)] = (vector, query, cached, time.time())
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def wrap(self, chain: Runnable, input_key: str = "input") -> Runnable:
+        """Puts the cache in front of a retrieval chain, keeping its invoke/batch API."""
+        def invoke(inputs: Dict[str, Any]) -> Dict[str, Any]:
+            cached = self.lookup(inputs[input_key])
+            if cached is not None:
+                return cached
+            result = chain.invoke(inputs)
+            self.update(inputs[input_key], result)
+            return result
+
+        async def ainvoke(inputs: Dict[str, Any]) -> Dict[str, Any]:
+            cached = self.lookup(inputs[input_key])
+            if cached is not None:
+                return cached
+            result = await chain.ainvoke(inputs)
+            self.update(inputs[input_key], result)
+            return result
+
+        return RunnableLambda(invoke, afunc=ainvoke)
+
+    def save(self, path: Optional[str] = None):
+        """Writes the (unexpired) entries to JSON so later runs can reuse them."""
+        path = path or self.path
+        with self._lock:
+            self._expire(time.time())
+            records = [
+                {
+                    "query": query,
+                    "vector": vector.tolist(),
+                    "answer": result["answer"],
+                    "context": [
+                        {"page_content": doc.page_content, "metadata": doc.metadata}
+                        for doc in result["context"]
+                    ],
+                    "created_at": created_at,
+                }
+                for vector, query, result, created_at in self._entries.values()
+            ]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(records, f)
+        os.replace(tmp_path, path)
+
+    def _load(self, path: str):
+        try:
+            with open(path, encoding="utf-8") as f:
+                records = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠ Could not read semantic cache {path}: {e}")
+            return
+        for record in records[-self.max_entries:]:
+            result = {
+                "answer": record["answer"],
+                "context": [Document(**doc) for doc in record["context"]],
+            }
+            vector = np.asarray(record["vector"], dtype="float32")
+            self._entries[next(self._ids)] = (vector, record["query"], result, record["created_at"])
+        self._expire(time.time())
@@ -0,0 +1,236 @@
+from typing import TYPE_CHECKING, Optional
+import time
+
+# qdrant_client is imported inside the functions so entry points that only
+# need the constants below (e.g. for --help) start without it
+if TYPE_CHECKING:
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import SearchParams
+
+# Qdrant's default: segments above this many KB of vectors get an HNSW index
+DEFAULT_INDEXING_THRESHOLD = 20000
+
+QUANTIZATION_CHOICES = ["none", "int8", "binary"]
+
+# Named sparse vector holding BM25 term weights next to the (unnamed) dense vector
+SPARSE_VECTOR_NAME = "bm25"
+
+
+def quantization_config(quantization: Optional[str]):
+    """Qdrant quantization config for ``"int8"``, ``"binary"`` or ``None``/``"none"``.
+
+    Quantized vectors stay in RAM for the HNSW search while the float32
+    originals can go to disk and are only read for rescoring.
+    """
+    from qdrant_client.models import (
+        BinaryQuantization,
+        BinaryQuantizationConfig,
+        ScalarQuantization,
+        ScalarQuantizationConfig,
+        ScalarType,
+    )
+
+    if quantization in (None, "none"):
+        return None
+    if quantization == "int8":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    if quantization == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATION_CHOICES}")
+
+
+def search_params(
+    rescore: bool = True,
+    oversampling: float = 2.0,
+    hnsw_ef: Optional[int] = None,
+    exact: bool = False,
+) -> "SearchParams":
+    """Query-time params: rescore quantized candidates with the original vectors.
+
+    Ignored by Qdrant for collections without quantization.
+    """
+    from qdrant_client.models import QuantizationSearchParams, SearchParams
+
+    return SearchParams(
+        hnsw_ef=hnsw_ef,
+        exact=exact,
+        quantization=QuantizationSearchParams(rescore=rescore, oversampling=oversampling),
+    )
+
+
+def create_collection(
+    client: "QdrantClient",
+    collection_name: str,
+    vector_size: int,
+    bulk: bool = False,
+    quantization: Optional[str] = None,
+    on_disk: bool = False,
+    hnsw_m: Optional[int] = None,
+    hnsw_ef_construct: Optional[int] = None,
+    sparse: bool = False,
+):
+    """Creates the docs collection.
+
+    With ``bulk=True`` HNSW indexing starts disabled (``indexing_threshold=0``)
+    so the upload does not re-index every batch; call ``enable_indexing`` once
+    everything is uploaded. ``quantization`` (``"int8"`` ~4x, ``"binary"``
+    ~32x smaller in RAM) and ``on_disk`` trade precision and latency for memory.
+    ``sparse`` adds the ``SPARSE_VECTOR_NAME`` sparse vector, with IDF computed
+    by Qdrant, for hybrid BM25 + dense search.
+    """
+    from qdrant_client.models import (
+        HnswConfigDiff,
+        Modifier,
+        OptimizersConfigDiff,
+        SparseIndexParams,
+        SparseVectorParams,
+        VectorParams,
+    )
+
+    hnsw_config = None
+    if hnsw_m is not None or hnsw_ef_construct is not None:
+        hnsw_config = HnswConfigDiff(m=hnsw_m, ef_construct=hnsw_ef_construct)
+
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=VectorParams(
+            size=vector_size,
+            distance="Cosine",
+            on_disk=on_disk,
+        ),
+        sparse_vectors_config={
+            SPARSE_VECTOR_NAME: SparseVectorParams(
+                index=SparseIndexParams(on_disk=on_disk),
+                modifier=Modifier.IDF,
+            )
+        } if sparse else None,
+        hnsw_config=hnsw_config,
+        quantization_config=quantization_config(quantization),
+        optimizers_config=OptimizersConfigDiff(indexing_threshold=0) if bulk else None,
+    )
+
+
+def _quantization_name(config) -> str:
+    from qdrant_client.models import BinaryQuantization, ScalarQuantization
+
+    if isinstance(config, ScalarQuantization):
+        return "int8"
+    if isinstance(config, BinaryQuantization):
+        return "binary"
+    return "none"
+
+
+def update_collection(
+    client: "QdrantClient",
+    collection_name: str,
+    quantization: Optional[str] = None,
+    on_disk: Optional[bool] = None,
+    hnsw_m: Optional[int] = None,
+    hnsw_ef_construct: Optional[int] = None,
+) -> bool:
+    """Applies the ``create_collection`` options to an existing collection.
+
+    ``None`` leaves a setting as it is and ``quantization="none"`` removes
+    quantization. Only settings that differ from the current config are sent,
+    since Qdrant re-quantizes or re-indexes the segments they touch. Returns
+    whether anything changed.
+    """
+    from qdrant_client.models import Disabled, HnswConfigDiff, VectorParamsDiff
+
+    config = client.get_collection(collection_name=collection_name).config
+    changes = {}
+    changed = []
+
+    if quantization is not None and quantization != _quantization_name(config.quantization_config):
+        changes["quantization_config"] = quantization_config(quantization) or Disabled.DISABLED
+        changed.append(f"quantization={quantization}")
+
+    hnsw = {}
+    if hnsw_m is not None and hnsw_m != config.hnsw_config.m:
+        hnsw["m"] = hnsw_m
+    if hnsw_ef_construct is not None and hnsw_ef_construct != config.hnsw_config.ef_construct:
+        hnsw["ef_construct"] = hnsw_ef_construct
+    if hnsw:
+        changes["hnsw_config"] = HnswConfigDiff(**hnsw)
+        changed.extend(f"hnsw_{key}={value}" for key, value in hnsw.items())
+
+    # The dense vector is unnamed, which update_collection addresses as ""
+    if on_disk is not None and on_disk != bool(config.params.vectors.on_disk):
+        changes["vectors_config"] = {"": VectorParamsDiff(on_disk=on_disk)}
+        changed.append(f"on_disk={on_disk}")
+
+    if not changes:
+        return False
+    print(f"🔧 Updating collection '{collection_name}': {', '.join(changed)}")
+    client.update_collection(collection_name=collection_name, **changes)
+    return True
+
+
+def has_sparse_vectors(client: "QdrantClient", collection_name: str) -> bool:
+    """Whether the collection was created with the BM25 sparse vector."""
+    info = client.get_collection(collection_name=collection_name)
+    return SPARSE_VECTOR_NAME in (info.config.params.sparse_vectors or {})
+
+
+def disable_indexing(client: "QdrantClient", collection_name: str):
+    from qdrant_client.models import OptimizersConfigDiff
+
+    client.update_collection(
+        collection_name=collection_name,
+        optimizers_config=OptimizersConfigDiff(indexing_threshold=0),
+    )
+
+
+def enable_indexing(
+    client: "QdrantClient",
+    collection_name: str,
+    indexing_threshold: int = DEFAULT_INDEXING_THRESHOLD,
+):
+    """Turns HNSW indexing back on; the optimizer then builds the index once."""
+    from qdrant_client.models import OptimizersConfigDiff
+
+    client.update_collection(
+        collection_name=collection_name,
+        optimizers_config=OptimizersConfigDiff(
+            indexing_threshold=indexing_threshold,
+            memmap_threshold=20000,
+        ),
+    )
+
+
+def wait_until_indexed(
+    client: "QdrantClient",
+    collection_name: str,
+    indexing_threshold: int = DEFAULT_INDEXING_THRESHOLD,
+    timeout: float = 1800,
+    interval: float = 2,
+) -> bool:
+    """Blocks until the collection is fully optimized and searchable.
+
+    Ready means status is green and ``indexed_vectors_count`` has caught up
+    with ``points_count``. Qdrant never indexes segments smaller than
+    ``indexing_threshold`` KB (they are searched exactly), so a remainder
+    below that size also counts as ready.
+    """
+    from qdrant_client.models import CollectionStatus
+
+    deadline = time.monotonic() + timeout
+    while True:
+        info = client.get_collection(collection_name=collection_name)
+        points = info.points_count or 0
+        indexed = info.indexed_vectors_count or 0
+        print(f"📊 Indexed vectors: {indexed}/{points} (status: {info.status})")
+
+        if info.status == CollectionStatus.GREEN:
+            if indexed >= points:
+                return True
+            vector_kb = info.config.params.vectors.size * 4 / 1024
+            if (points - indexed) * vector_kb < indexing_threshold:
+                return True
+
+        if time.monotonic() >= deadline:
+            print(f"⚠ Collection '{collection_name}' still not fully indexed after {timeout:.0f}s")
+            return False
+        time.sleep(interval)
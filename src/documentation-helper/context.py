@@ -0,0 +1,139 @@
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import Runnable, RunnableLambda
+
+
+def approx_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+def _normalize(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype="float32")
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def _trim_overlap(text: str, previous: str, max_overlap: int, min_overlap: int = 20) -> str:
+    """Drops the part of ``text`` that repeats the end or the start of ``previous``."""
+    for size in range(min(max_overlap, len(previous), len(text)), min_overlap - 1, -1):
+        if previous.endswith(text[:size]):
+            return text[size:].lstrip()
+        if previous.startswith(text[-size:]):
+            return text[:-size].rstrip()
+    return text
+
+
+class ContextBudgeter:
+    """Selects which retrieved chunks are stuffed into the QA prompt.
+
+    The wrapped retriever should over-fetch candidates. They are scored against
+    the query (with ``cross_encoder`` if one is given, else by embedding
+    cosine similarity), then picked with maximal marginal relevance so that
+    near-duplicates lose out to new information. Chunks at or above
+    ``duplicate_threshold`` similarity to an already picked one are dropped,
+    the ``chunk_overlap`` characters repeated from a neighbouring chunk of
+    the same source are trimmed, and chunks are packed until ``k`` documents
+    or ``max_tokens`` are used.
+
+    Document vectors are read from ``metadata[vector_key]`` when the retriever
+    returns them (``QdrantBatchRetriever(with_vectors=True)``) and only
+    embedded otherwise; the key is removed from the selected documents.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        k: int = 4,
+        max_tokens: int = 480,
+        mmr_lambda: float = 0.7,
+        duplicate_threshold: float = 0.95,
+        chunk_overlap: int = 50,
+        cross_encoder: Optional[Any] = None,
+        count_tokens: Callable[[str], int] = approx_tokens,
+        vector_key: str = "_vector",
+    ):
+        self.embeddings = embeddings
+        self.k = k
+        self.max_tokens = max_tokens
+        self.mmr_lambda = mmr_lambda
+        self.duplicate_threshold = duplicate_threshold
+        self.chunk_overlap = chunk_overlap
+        self.cross_encoder = cross_encoder
+        self.count_tokens = count_tokens
+        self.vector_key = vector_key
+
+    def _relevance(self, query: str, docs: List[Document], doc_vectors: np.ndarray) -> np.ndarray:
+        if self.cross_encoder is not None:
+            scores = np.asarray(
+                self.cross_encoder.predict([(query, doc.page_content) for doc in docs]),
+                dtype="float32",
+            )
+            # Squash logits into [0, 1] so they are comparable with cosine similarities
+            return 1.0 / (1.0 + np.exp(-scores))
+        return doc_vectors @ _normalize(self.embeddings.embed_query(query))
+
+    def select(self, query: str, docs: List[Document]) -> List[Document]:
+        if not docs:
+            return []
+        stored = [doc.metadata.get(self.vector_key) for doc in docs]
+        if all(vector is not None for vector in stored):
+            doc_vectors = _normalize(stored)
+        else:
+            doc_vectors = _normalize(self.embeddings.embed_documents([doc.page_content for doc in docs]))
+        relevance = self._relevance(query, docs, doc_vectors)
+
+        remaining = list(range(len(docs)))
+        picked: List[int] = []
+        selected: List[Document] = []
+        used_tokens = 0
+        while remaining and len(selected) < self.k:
+            if picked:
+                redundancy = (doc_vectors[remaining] @ doc_vectors[picked].T).max(axis=1)
+            else:
+                redundancy = np.zeros(len(remaining), dtype="float32")
+            scores = self.mmr_lambda * relevance[remaining] - (1 - self.mmr_lambda) * redundancy
+            best = int(np.argmax(scores))
+            index = remaining.pop(best)
+            if redundancy[best] >= self.duplicate_threshold:
+                continue
+
+            doc = docs[index]
+            text = doc.page_content
+            for previous in selected:
+                if previous.metadata.get("source") == doc.metadata.get("source"):
+                    text = _trim_overlap(text, previous.page_content, self.chunk_overlap)
+            tokens = self.count_tokens(text)
+            if used_tokens + tokens > self.max_tokens:
+                # Smaller, less relevant chunks may still fit
+                continue
+
+            picked.append(index)
+            metadata = {key: value for key, value in doc.metadata.items() if key != self.vector_key}
+            selected.append(Document(page_content=text, metadata=metadata))
+            used_tokens += tokens
+        return selected
+
+    def wrap(self, retriever: Runnable, input_key: str = "input") -> Runnable:
+        """Retriever for ``create_retrieval_chain`` that returns the budgeted context."""
+        def invoke(inputs: Dict[str, Any]) -> List[Document]:
+            query = inputs[input_key]
+            return self.select(query, retriever.invoke(query))
+
+        async def ainvoke(inputs: Dict[str, Any]) -> List[Document]:
+            query = inputs[input_key]
+            docs = await retriever.ainvoke(query)
+            return await asyncio.get_running_loop().run_in_executor(None, self.select, query, docs)
+
+        return RunnableLambda(invoke, afunc=ainvoke)
+
+
+def load_cross_encoder(model_name: str, device: Optional[str] = None):
+    """Loads a local sentence-transformers cross-encoder for re-ranking."""
+    from sentence_transformers import CrossEncoder
+
+    return CrossEncoder(model_name, device=device)
@@ -0,0 +1,154 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from typing import Iterable, Iterator, List, Optional, Tuple
+import os
+import time
+
+from langchain_core.documents import Document
+
+from embeddings.cached import MODEL_NAME, load_embeddings
+from parallel.pool import pool_context
+
+# Embedding model owned by each pool worker (loaded once per process)
+_worker_embedding = None
+
+
+def _init_worker(model_name: str, device: str, threads: int):
+    """Load the embedding model once inside a pool worker."""
+    global _worker_embedding
+    # Split the cores between workers instead of letting each one grab all of them
+    _worker_embedding = load_embeddings(model_name=model_name, device=device, threads=threads)
+
+
+def _embed_in_worker(texts: List[str]) -> Tuple[List[Optional[List[float]]], float, float]:
+    return _timed_embed(_worker_embedding, texts)
+
+
+def _timed_embed(embedding, texts: List[str]) -> Tuple[List[Optional[List[float]]], float, float]:
+    """``embed_texts`` plus its start and end time (wall clock, comparable across processes)."""
+    started = time.time()
+    vectors = embed_texts(embedding, texts)
+    return vectors, started, time.time()
+
+
+def embed_texts(embedding, texts: List[str]) -> List[Optional[List[float]]]:
+    """Embeds a batch of texts, falling back to one-by-one on failure.
+
+    A failed chunk gets ``None`` so one bad chunk never drops its whole batch.
+    """
+    try:
+        return embedding.embed_documents(texts)
+    except Exception as e:
+        print(f"⚠ Batch of {len(texts)} chunks failed ({e}), retrying one by one...")
+
+    vectors = []
+    for text in texts:
+        try:
+            vectors.append(embedding.embed_query(text))
+        except Exception as e:
+            print(f"❌ Error embedding chunk: {e}")
+            vectors.append(None)
+    return vectors
+
+
+class EmbeddingEngine:
+    """Embeds documents in batches, optionally across a process pool."""
+
+    def __init__(
+        self,
+        model_name: str = MODEL_NAME,
+        device: str = "cpu",
+        batch_size: int = 64,
+        workers: int = 1,
+        embedding=None,
+    ):
+        self.model_name = model_name
+        self.device = device
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self._embedding = embedding
+        self.embedded = 0
+        self.failed = 0
+        # Seconds during which at least one batch was being embedded
+        self.elapsed = 0.0
+        self._busy_until = 0.0
+
+    @property
+    def embedding(self):
+        """Embedding model used in-process (loaded on first use)."""
+        if self._embedding is None:
+            self._embedding = load_embeddings(model_name=self.model_name, device=self.device)
+        return self._embedding
+
+    @property
+    def throughput(self) -> float:
+        """Embedded chunks per second of embedding time (not time spent waiting for input)."""
+        return self.embedded / self.elapsed if self.elapsed else 0.0
+
+    def batches(self, documents: Iterable[Document]) -> Iterator[List[Document]]:
+        """Groups documents into lists of ``batch_size``."""
+        batch = []
+        for doc in documents:
+            batch.append(doc)
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def embed_batches(
+        self, batches: Iterable[List[Document]]
+    ) -> Iterator[List[Tuple[Document, List[float]]]]:
+        """Yields ``(document, vector)`` pairs per batch, in input order.
+
+        Chunks that failed to embed are left out of the batch they belong to.
+        """
+        if self.workers == 1:
+            for batch in batches:
+                yield self._collect(batch, *_timed_embed(self.embedding, [doc.page_content for doc in batch]))
+            return
+
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        # Usually called from a pipeline thread; forking a multithreaded process can deadlock
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=pool_context(),
+            initializer=_init_worker,
+            initargs=(self.model_name, self.device, threads),
+        ) as pool:
+            # Keep a couple of batches queued per worker, not the whole corpus
+            pending = deque()
+            for batch in batches:
+                texts = [doc.page_content for doc in batch]
+                pending.append((batch, pool.submit(_embed_in_worker, texts)))
+                if len(pending) >= self.workers * 2:
+                    batch, future = pending.popleft()
+                    yield self._collect(batch, *future.result())
+            while pending:
+                batch, future = pending.popleft()
+                yield self._collect(batch, *future.result())
+
+    def report(self):
+        print(
+            f"📈 Embedded {self.embedded} chunks ({self.failed} failed) "
+            f"in {self.elapsed:.1f}s of embedding time - {self.throughput:.1f} chunks/s"
+        )
+
+    def _collect(self, batch, vectors, started: float, finished: float):
+        # Union of the batches' embedding intervals, so parallel workers are not
+        # counted twice. Batches arrive in submission order, which is the order
+        # the pool starts them in
+        if started >= self._busy_until:
+            self.elapsed += finished - started
+        elif finished > self._busy_until:
+            self.elapsed += finished - self._busy_until
+        self._busy_until = max(self._busy_until, finished)
+
+        pairs = []
+        for doc, vector in zip(batch, vectors):
+            if vector is None:
+                self.failed += 1
+            else:
+                pairs.append((doc, vector))
+        self.embedded += len(pairs)
+        return pairs
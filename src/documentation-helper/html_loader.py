@@ -0,0 +1,157 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import hashlib
+import json
+import os
+
+from langchain_core.documents import Document
+
+from parallel.pool import pool_context
+
+# ReadTheDocsLoader owned by each pool worker, only used for its HTML cleaning
+_worker_loader = None
+
+
+def _init_worker(path: str, encoding: str):
+    global _worker_loader
+    from langchain_community.document_loaders import ReadTheDocsLoader
+
+    _worker_loader = ReadTheDocsLoader(path, encoding=encoding)
+
+
+def _parse_files(
+    files: List[Tuple[str, Optional[str]]], encoding: str
+) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """Returns ``(path, sha256, text)``.
+
+    Text is ``None`` if the hash is unchanged; hash and text are both ``None``
+    if the file could not be parsed.
+    """
+    results = []
+    for path, known_hash in files:
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+            digest = hashlib.sha256(raw).hexdigest()
+            if digest == known_hash:
+                results.append((path, digest, None))
+                continue
+            # Same cleaning ReadTheDocsLoader.lazy_load applies
+            text = _worker_loader._clean_data(raw.decode(encoding))
+        except Exception as e:
+            print(f"❌ Error parsing {path}: {e}")
+            results.append((path, None, None))
+            continue
+        results.append((path, digest, text))
+    return results
+
+
+class ParallelReadTheDocsLoader:
+    """Drop-in for ``ReadTheDocsLoader(...).lazy_load()`` that parses on a process pool.
+
+    Files whose mtime/size (or, failing that, content hash) match the on-disk
+    index from the last run are skipped. Their paths are collected in
+    ``unchanged`` so callers can keep what they stored for them. New index
+    entries are only written by ``commit``, once the caller knows which
+    documents were stored successfully.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        index_path: str,
+        encoding: str = "utf-8",
+        workers: int = os.cpu_count() or 1,
+        files_per_task: int = 16,
+        patterns: Tuple[str, ...] = ("*.htm", "*.html"),
+        reset: bool = False,
+    ):
+        self.path = path
+        self.index_path = index_path
+        self.encoding = encoding
+        self.workers = max(1, workers)
+        self.files_per_task = files_per_task
+        self.patterns = patterns
+        self.previous: Dict[str, list] = {} if reset else self._read_index()
+        self.current: Dict[str, list] = {}
+        self.unchanged: List[str] = []
+        # Parsed fine but no text left after cleaning: indexed, but no document
+        self.empty: List[str] = []
+
+    def _read_index(self) -> Dict[str, list]:
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠ Could not read HTML index {self.index_path}, parsing everything: {e}")
+            return {}
+
+    def _tasks(self) -> Iterator[List[Tuple[str, Optional[str]]]]:
+        """Groups changed files into tasks, skipping the ones with the same mtime/size."""
+        task = []
+        for pattern in self.patterns:
+            for p in Path(self.path).rglob(pattern):
+                if p.is_dir():
+                    continue
+                path = str(p)
+                stat = p.stat()
+                entry = self.previous.get(path)
+                if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                    self.current[path] = entry
+                    self.unchanged.append(path)
+                    continue
+                self.current[path] = [stat.st_mtime_ns, stat.st_size, None]
+                task.append((path, entry[2] if entry else None))
+                if len(task) == self.files_per_task:
+                    yield task
+                    task = []
+        if task:
+            yield task
+
+    def lazy_load(self) -> Iterator[Document]:
+        # Runs in a pipeline thread while other threads load models, and forking
+        # a multithreaded process can deadlock, so workers start from a clean process
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=pool_context(),
+            initializer=_init_worker,
+            initargs=(self.path, self.encoding),
+        ) as pool:
+            pending = deque()
+
+            def collect():
+                for path, digest, text in pending.popleft().result():
+                    # A file that failed to parse keeps its previous documents
+                    # and is left out of the index, so it is retried next run
+                    self.current[path][2] = digest
+                    if text is None:
+                        self.unchanged.append(path)
+                    elif text:
+                        yield Document(page_content=text, metadata={"source": path})
+                    else:
+                        # ReadTheDocsLoader.lazy_load skips empty pages too
+                        self.empty.append(path)
+
+            for task in self._tasks():
+                pending.append(pool.submit(_parse_files, task, self.encoding))
+                if len(pending) >= self.workers * 2:
+                    yield from collect()
+            while pending:
+                yield from collect()
+
+    def commit(self, is_stored: Callable[[str], bool] = lambda path: True):
+        """Writes the index, keeping only files whose documents ``is_stored`` (and empty ones)."""
+        empty = set(self.empty)
+        index = {
+            path: entry
+            for path, entry in self.current.items()
+            if entry[2] is not None and (path in empty or is_stored(path))
+        }
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
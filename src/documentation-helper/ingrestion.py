@@ -1,29 +1,238 @@
 from dotenv import load_dotenv
-from langchain_text_splitters import RecursiveCharacterTextSplitter  
-from langchain_huggingface import HuggingFaceEmbeddings
-from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct, VectorParams, Distance, OptimizersConfigDiff
-from langchain_community.document_loaders import ReadTheDocsLoader
-import torch
+from functools import lru_cache
+from typing import Optional
+import argparse
 import time
 import os
+import sys
+
+# Make the shared modules under src/ importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collection import (
+    QUANTIZATION_CHOICES,
+    SPARSE_VECTOR_NAME,
+    create_collection,
+    disable_indexing,
+    enable_indexing,
+    has_sparse_vectors,
+    update_collection,
+    wait_until_indexed,
+)
+from manifest import IngestManifest, chunk_id, content_hash
+from pipeline import run_pipeline
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Qdrant client with gRPC
-qdrant_client = QdrantClient(
-    url="localhost:6334",  # Use gRPC URL
-    prefer_grpc=True  # Enable gRPC communication
-)
+# Qdrant gRPC URL; the client, torch, LangChain and the model are only loaded
+# once ingestion starts, so importing this module or running --help is fast
+qdrant_url = "localhost:6334"
 
 collection_name = "docs_collection"
 
-# Set device for embeddings
-device = "cuda" if torch.cuda.is_available() else "cpu"
+# Embedding batch size and number of embedding worker processes
+embed_batch_size = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+embed_workers = int(os.getenv("EMBED_WORKERS", "1"))
+
+# Initial points per Qdrant upsert (adapted to latency), concurrent upserts,
+# and max items buffered between pipeline stages
+upload_batch_size = int(os.getenv("UPLOAD_BATCH_SIZE", "50"))
+upload_in_flight = int(os.getenv("UPLOAD_IN_FLIGHT", "4"))
+queue_size = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+
+# Defer HNSW indexing until after the upload even when the collection already exists
+bulk_load = os.getenv("BULK_LOAD", "0") == "1"
+
+# Hashes of what is already in Qdrant, used to only re-ingest changed chunks,
+# and mtime/size/hash of the HTML files parsed last run
+manifest_path = os.getenv(
+    "INGEST_MANIFEST", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ingest_manifest.json")
+)
+html_index_path = os.getenv(
+    "HTML_INDEX", os.path.join(os.path.dirname(os.path.abspath(__file__)), "html_index.json")
+)
+
+# Processes parsing HTML
+parse_workers = int(os.getenv("PARSE_WORKERS", str(os.cpu_count() or 1)))
+
+# Also store BM25 sparse vectors for hybrid (dense + keyword) search
+hybrid_search = os.getenv("HYBRID_SEARCH", "1") != "0"
+
+def source_url(path: str) -> str:
+    """Maps a local docs file path to the URL stored as the chunk source."""
+    return path.replace("langchain-docs", "https:/")
+
+@lru_cache(maxsize=None)
+def get_client():
+    """Qdrant client with gRPC, created on first use."""
+    from qdrant_client import QdrantClient
+
+    return QdrantClient(url=qdrant_url, prefer_grpc=True)
+
+def get_device() -> str:
+    """Device for embeddings."""
+    import torch
+
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+def ensure_collection(vector_size: int, bulk: bool = False, **collection_options):
+    """Creates the Qdrant collection if it does not exist yet.
+
+    ``collection_options`` (quantization, on_disk, hnsw_m, hnsw_ef_construct,
+    sparse) are used for a new collection; ``ingest_docs`` applies them to an
+    existing one up front with ``update_collection``.
+    """
+    qdrant_client = get_client()
+    collections = qdrant_client.get_collections().collections
+    collection_names = [collection.name for collection in collections]
+
+    if collection_name not in collection_names:
+        print(f"🚀 Creating new Qdrant collection via gRPC{' in bulk-load mode' if bulk else ''}...")
+        create_collection(qdrant_client, collection_name, vector_size, bulk=bulk, **collection_options)
+        print("✅ Collection created successfully.")
+    else:
+        print(f"✅ Collection '{collection_name}' exists.")
+
+def split_stage(raw_documents, manifest: IngestManifest):
+    """Splits each new or changed page into chunks as soon as it arrives.
+
+    Unchanged pages are skipped, and chunks already stored in Qdrant are not re-emitted.
+    """
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=600, chunk_overlap=50)
+    skipped = 0
+    for i, raw_document in enumerate(raw_documents, start=1):
+        if i % 100 == 0:
+            print(f"📄 Loaded and split {i} documents ({skipped} unchanged)")
+
+        # Fix document metadata
+        source = source_url(raw_document.metadata.get("source", ""))
+        raw_document.metadata.update({"source": source})
+
+        source_hash = content_hash(raw_document.page_content)
+        if manifest.is_unchanged(source, source_hash):
+            skipped += 1
+            continue
+
+        chunks = text_splitter.split_documents([raw_document])
+        for doc in chunks:
+            doc.metadata["chunk_id"] = chunk_id(source, doc.page_content)
+        to_embed = manifest.plan_source(
+            source, source_hash, [doc.metadata["chunk_id"] for doc in chunks]
+        )
+
+        for doc in chunks:
+            if doc.metadata["chunk_id"] in to_embed:
+                # Identical chunks within a page share an id, embed them once
+                to_embed.discard(doc.metadata["chunk_id"])
+                yield doc
+
+def upsert_stage(embedded_batches, manifest: IngestManifest, bulk: bool = False, **collection_options):
+    """Uploads embedded chunks to Qdrant with pipelined async batches.
+
+    Yields the total number of points stored once the stream is exhausted.
+    """
+    from qdrant_client.models import PointStruct
+    from retrieval.bm25 import BM25Encoder
+    from uploader import AsyncUploader
+
+    # BM25 term weights for the sparse vector, if the collection has one
+    sparse_encoder = BM25Encoder() if collection_options.get("sparse") else None
+
+    def points():
+        collection_ready = False
+        for pairs in embedded_batches:
+            if not pairs:
+                continue
+            if not collection_ready:
+                ensure_collection(vector_size=len(pairs[0][1]), bulk=bulk, **collection_options)
+                collection_ready = True
+            for doc, vector in pairs:
+                if sparse_encoder is not None:
+                    vector = {"": vector, SPARSE_VECTOR_NAME: sparse_encoder.encode_document(doc.page_content)}
+                point = PointStruct(
+                    id=doc.metadata["chunk_id"],
+                    vector=vector,
+                    payload={
+                        "text": doc.page_content,
+                        "source": doc.metadata.get("source", "")
+                    }
+                )
+                yield point, doc
+
+    def on_uploaded(docs):
+        for doc in docs:
+            manifest.mark_uploaded(doc.metadata["source"], [doc.metadata["chunk_id"]])
+
+    uploader = AsyncUploader(
+        collection_name=collection_name,
+        url=qdrant_url,
+        max_in_flight=upload_in_flight,
+        batch_size=upload_batch_size,
+    )
+    yield uploader.upload(points(), on_uploaded=on_uploaded)
+    if uploader.failed:
+        print(f"⚠ {uploader.failed} points failed to upload, their pages will be retried next run")
+
+def delete_orphans(manifest: IngestManifest):
+    """Removes points whose chunks disappeared from the docs since the last run."""
+    orphaned = manifest.orphaned_ids()
+    if not orphaned:
+        return
+    from qdrant_client.models import PointIdsList
+
+    print(f"🧹 Deleting {len(orphaned)} stale points...")
+    for i in range(0, len(orphaned), 1000):
+        get_client().delete(
+            collection_name=collection_name,
+            points_selector=PointIdsList(points=orphaned[i:i + 1000]),
+        )
+
+def sweep_unreferenced(manifest: IngestManifest):
+    """Deletes every point in the collection that this run's manifest does not reference.
+
+    Used when the collection exists but there was no readable manifest, e.g.
+    points stored under the old positional ids, which ``delete_orphans`` cannot see.
+    """
+    from qdrant_client.models import PointIdsList
+
+    qdrant_client = get_client()
+    live = manifest.live_ids()
+    unreferenced = []
+    offset = None
+    print(f"🧹 No manifest for existing collection '{collection_name}', sweeping unreferenced points...")
+    while True:
+        points, offset = qdrant_client.scroll(
+            collection_name=collection_name,
+            limit=1000,
+            offset=offset,
+            with_payload=False,
+            with_vectors=False,
+        )
+        unreferenced.extend(point.id for point in points if str(point.id) not in live)
+        if offset is None:
+            break
+
+    for i in range(0, len(unreferenced), 1000):
+        qdrant_client.delete(
+            collection_name=collection_name,
+            points_selector=PointIdsList(points=unreferenced[i:i + 1000]),
+        )
+    print(f"🧹 Deleted {len(unreferenced)} points not in the manifest, kept {len(live)}")
+
+def ingest_docs(
+    quantization: Optional[str] = None,
+    on_disk: Optional[bool] = None,
+    hnsw_m: Optional[int] = None,
+    hnsw_ef_construct: Optional[int] = None,
+):
+    """Streams documents through load -> split -> embed -> upsert into Qdrant using gRPC.
 
-def ingest_docs():
-    """Loads, processes, and indexes documents into Qdrant using gRPC."""
+    The quantization, on-disk and HNSW options are used when the collection is
+    created, or applied to it if it exists; ``None`` keeps the current setting.
+    """
     
     # Load documents
     docs_path = r"E:\\Computing\\LLm-Engineer\\LangChain-tutorial\\src\\documentation-helper\\langchain-docs\\api.python.langchain.com\\en\\latest"
@@ -32,119 +241,143 @@ def ingest_docs():
     if not os.path.exists(docs_path):
         print(f"❌ Path does not exist: {docs_path}")
         return
-        
-    loader = ReadTheDocsLoader(
-        docs_path,
-        encoding="utf-8"
-    )
-    
-    try:
-        raw_documents = loader.load()
-        print(f"✅ Loaded {len(raw_documents)} documents")
-    except Exception as e:
-        print(f"❌ Error loading documents: {e}")
-        return
-    
-    # Split documents into chunks
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=600, chunk_overlap=50)
-    documents = text_splitter.split_documents(raw_documents)
 
-    # Fix document metadata
-    for doc in documents:
-        new_url = doc.metadata.get("source", "")
-        new_url = new_url.replace("langchain-docs", "https:/")
-        doc.metadata.update({"source": new_url})
-    
-    print(f"🔄 Processing {len(documents)} documents for indexing...")
+    from embedding_engine import EmbeddingEngine
+    from html_loader import ParallelReadTheDocsLoader
 
-    # Initialize embedding model
-    embedding = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-mpnet-base-v2",
-        model_kwargs={"device": device}
-    )
+    qdrant_client = get_client()
+
+    # A missing collection means nothing from the manifest is actually stored
+    collection_exists = qdrant_client.collection_exists(collection_name)
+    manifest = IngestManifest(manifest_path, reset=not collection_exists)
+    # Without a manifest nothing is known about the stored points: re-read every
+    # page, then sweep whatever the new manifest does not reference
+    sweep = collection_exists and not manifest.loaded
 
-    # Generate embeddings with error handling
-    print("⏳ Generating embeddings...")
-    embeddings = []
-    for i, doc in enumerate(documents):
+    # Sparse vectors can only be added to a collection when it is created
+    sparse = hybrid_search and (not collection_exists or has_sparse_vectors(qdrant_client, collection_name))
+    if hybrid_search and not sparse:
+        print(f"⚠ Collection '{collection_name}' has no '{SPARSE_VECTOR_NAME}' sparse vector; "
+              "delete it and re-run to enable hybrid search")
+
+    if collection_exists:
         try:
-            if i % 100 == 0:
-                print(f"Processed {i}/{len(documents)} embeddings")
-            embeddings.append(embedding.embed_query(doc.page_content))
+            update_collection(
+                qdrant_client,
+                collection_name,
+                quantization=quantization,
+                on_disk=on_disk,
+                hnsw_m=hnsw_m,
+                hnsw_ef_construct=hnsw_ef_construct,
+            )
         except Exception as e:
-            print(f"❌ Error embedding document {i}: {e}")
-            continue
+            print(f"⚠ Could not update collection '{collection_name}', keeping its current config: {e}")
 
-    if not embeddings:
-        print("⚠ No embeddings generated. Exiting...")
-        return
+    collection_options = dict(
+        quantization=quantization,
+        on_disk=on_disk,
+        hnsw_m=hnsw_m,
+        hnsw_ef_construct=hnsw_ef_construct,
+        sparse=sparse,
+    )
 
-    vector_size = len(embeddings[0])
-    
-    # Check if collection exists and create if needed
+    # Parses HTML across processes, skipping files unchanged since the last run
+    loader = ParallelReadTheDocsLoader(
+        docs_path,
+        index_path=html_index_path,
+        encoding="utf-8",
+        workers=parse_workers,
+        reset=not collection_exists or sweep,
+    )
+
+    # New collections are always bulk-loaded: HNSW indexing stays off until the upload is done
+    bulk = bulk_load or not collection_exists
+    if bulk and collection_exists:
+        print("⏸ Disabling indexing for bulk load...")
+        disable_indexing(qdrant_client, collection_name)
+
+    # Initialize embedding engine
+    engine = EmbeddingEngine(
+        device=get_device(),
+        batch_size=embed_batch_size,
+        workers=embed_workers,
+    )
+
+    print(f"⏳ Streaming documents into Qdrant (batch size {embed_batch_size}, {embed_workers} worker(s))...")
+    uploaded = 0
     try:
-        collections = qdrant_client.get_collections().collections
-        collection_names = [collection.name for collection in collections]
-        
-        if collection_name not in collection_names:
-            print("🚀 Creating new Qdrant collection via gRPC with proper indexing...")
-            qdrant_client.create_collection(
-                collection_name=collection_name,
-                vectors_config=VectorParams(
-                    size=vector_size,
-                    distance="Cosine"
-                )
-            )
-            print("✅ Collection created successfully with indexing configuration.")
-        else:
-            print(f"✅ Collection '{collection_name}' exists.")
+        for count in run_pipeline(
+            loader.lazy_load(),
+            [
+                lambda raw_documents: split_stage(raw_documents, manifest),
+                lambda docs: engine.embed_batches(engine.batches(docs)),
+                lambda embedded: upsert_stage(embedded, manifest, bulk=bulk, **collection_options),
+            ],
+            maxsize=queue_size,
+        ):
+            uploaded += count
     except Exception as e:
-        print(f"❌ Error checking or creating collection: {e}")
+        print(f"❌ Error during ingestion: {e}")
         return
+    finally:
+        # Never leave the collection with indexing switched off
+        if bulk and qdrant_client.collection_exists(collection_name):
+            print("🔄 Re-enabling indexing...")
+            enable_indexing(qdrant_client, collection_name)
+    engine.report()
+    print(f"⏭ Skipped {len(loader.unchanged)} unchanged HTML files")
 
-    print("📤 Uploading data to Qdrant in batches...")
+    # Pages that were not re-read still own their chunks
+    for path in loader.unchanged:
+        manifest.keep(source_url(path))
 
-    batch_size = 50  
-    total_docs = len(embeddings)
-
-    for i in range(0, total_docs, batch_size):
-        end_idx = min(i + batch_size, total_docs)
-        batch_embeddings = embeddings[i:end_idx]
-        batch_texts = documents[i:end_idx]
-
-        points = [
-            PointStruct(
-                id=i + idx,  
-                vector=batch_embeddings[idx],
-                payload={
-                    "text": batch_texts[idx].page_content,
-                    "source": batch_texts[idx].metadata.get("source", "")
-                }
-            )
-            for idx in range(len(batch_embeddings))
-        ]
-        
-        try:
-            qdrant_client.upsert(collection_name=collection_name, points=points)
-            print(f"✅ Uploaded batch {i // batch_size + 1}/{(total_docs // batch_size) + 1}")
-        except Exception as e:
-            print(f"❌ Error uploading batch {i // batch_size + 1}: {e}")
-    
-    # Force index optimization
-    print("🔄 Forcing index optimization...")
     try:
-        qdrant_client.update_collection(
-            collection_name=collection_name,
-            optimizers_config=OptimizersConfigDiff(
-                default_segment_number=0,
-                memmap_threshold=20000,
-            )
-        )
-        print("✅ Optimization triggered.")
+        if sweep:
+            sweep_unreferenced(manifest)
+        else:
+            delete_orphans(manifest)
     except Exception as e:
-        print(f"❌ Error optimizing collection: {e}")
+        print(f"❌ Error deleting stale points: {e}")
+        return
+    manifest.save()
+    loader.commit(is_stored=lambda path: manifest.is_stored(source_url(path)))
+
+    if uploaded:
+        print(f"📤 Uploaded {uploaded} new or changed points to Qdrant")
+    elif not collection_exists:
+        print("⚠ No points uploaded. Exiting...")
+        return
+    else:
+        print("✅ No new or changed chunks.")
+
+    # Only report done once the collection is actually searchable
+    print("⏳ Waiting for indexing to complete...")
+    if not wait_until_indexed(qdrant_client, collection_name):
+        return
+    print("✅ Indexing complete!")
     
     print("🎉 Data processing complete!")
 
 if __name__ == "__main__":
-    ingest_docs()
\ No newline at end of file
+    parser = argparse.ArgumentParser(
+        description="Ingest the LangChain API docs into Qdrant.",
+        epilog="The collection options (quantization, on-disk, HNSW) are used when the collection is created. For an "
+               "existing collection, only the options you pass are applied with update_collection, "
+               "and Qdrant re-quantizes or re-indexes in the background. Options you leave out "
+               "keep their current values.",
+    )
+    parser.add_argument("--quantization", choices=QUANTIZATION_CHOICES, default=None,
+                        help="int8 (~4x less RAM) or binary (~32x) quantization with rescoring; "
+                             "none removes it")
+    parser.add_argument("--on-disk", action="store_true", default=None,
+                        help="keep the original float32 vectors on disk")
+    parser.add_argument("--hnsw-m", type=int, default=None, help="HNSW graph degree")
+    parser.add_argument("--hnsw-ef-construct", type=int, default=None, help="HNSW build-time beam width")
+    args = parser.parse_args()
+
+    ingest_docs(
+        quantization=args.quantization,
+        on_disk=args.on_disk,
+        hnsw_m=args.hnsw_m,
+        hnsw_ef_construct=args.hnsw_ef_construct,
+    )
\ No newline at end of file
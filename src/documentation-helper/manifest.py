@@ -0,0 +1,106 @@
+from typing import Dict, Iterable, List, Set
+import hashlib
+import json
+import os
+import uuid
+
+# Namespace for content-addressed Qdrant point ids
+CHUNK_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "docs_collection")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_id(source: str, text: str) -> str:
+    """Deterministic point id for a chunk: same source + same text -> same id."""
+    return str(uuid.uuid5(CHUNK_NAMESPACE, f"{source}\n{content_hash(text)}"))
+
+
+class IngestManifest:
+    """Per-source content hashes and chunk ids from the last ingestion run.
+
+    The manifest is a small JSON file::
+
+        {"sources": {"<source url>": {"hash": "<sha256>", "chunks": ["<point id>", ...]}}}
+
+    Sources whose hash is unchanged are skipped entirely, changed sources only
+    embed chunks that are not in Qdrant yet, and chunks that no longer belong
+    to any source are reported by ``orphaned_ids`` for deletion. ``loaded`` is
+    False when there was no readable manifest, so the caller cannot know what
+    is stored and has to sweep the collection against ``live_ids`` instead.
+    """
+
+    def __init__(self, path: str, reset: bool = False):
+        self.path = path
+        self.loaded = False
+        self.previous: Dict[str, dict] = {} if reset else self._read()
+        self.current: Dict[str, dict] = {}
+        self._expected: Dict[str, Set[str]] = {}
+
+    def _read(self) -> Dict[str, dict]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                sources = json.load(f)["sources"]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠ Could not read manifest {self.path}, starting fresh: {e}")
+            return {}
+        self.loaded = True
+        return sources
+
+    def is_unchanged(self, source: str, source_hash: str) -> bool:
+        """True if the source was fully ingested last run with the same content."""
+        entry = self.previous.get(source)
+        if entry and entry.get("hash") == source_hash:
+            self.current[source] = entry
+            return True
+        return False
+
+    def keep(self, source: str):
+        """Carries over a source that was not re-read this run."""
+        if source in self.previous:
+            self.current[source] = self.previous[source]
+
+    def is_stored(self, source: str) -> bool:
+        """True if every chunk of the source is in Qdrant (valid after ``save``)."""
+        entry = self.current.get(source)
+        return entry is not None and entry.get("hash") is not None
+
+    def plan_source(self, source: str, source_hash: str, chunk_ids: Iterable[str]) -> Set[str]:
+        """Records the new chunks of a changed source and returns the ids to embed."""
+        chunk_ids = set(chunk_ids)
+        old = set(self.previous.get(source, {}).get("chunks", []))
+        self.current[source] = {"hash": source_hash, "chunks": sorted(chunk_ids & old)}
+        self._expected[source] = chunk_ids
+        return chunk_ids - old
+
+    def mark_uploaded(self, source: str, ids: Iterable[str]):
+        self.current[source]["chunks"].extend(ids)
+
+    def live_ids(self) -> Set[str]:
+        """Point ids referenced by this run's manifest."""
+        return {cid for entry in self.current.values() for cid in entry["chunks"]}
+
+    def orphaned_ids(self) -> List[str]:
+        """Point ids from the last run that no source references anymore."""
+        live = self.live_ids()
+        return [
+            cid
+            for entry in self.previous.values()
+            for cid in entry.get("chunks", [])
+            if cid not in live
+        ]
+
+    def save(self):
+        for source, expected in self._expected.items():
+            entry = self.current[source]
+            # Some chunks failed to embed or upload: retry this source next run
+            if not expected.issubset(entry["chunks"]):
+                entry["hash"] = None
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"sources": self.current}, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,64 @@
+from queue import Queue
+from threading import Thread
+from typing import Callable, Iterable, Iterator, List
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+class _StageError:
+    """Carries an exception from a stage thread to the consumer."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _drain(queue: Queue) -> Iterator:
+    while True:
+        item = queue.get()
+        if item is _DONE:
+            return
+        if isinstance(item, _StageError):
+            raise item.error
+        yield item
+
+
+def _feed(items: Iterable, queue: Queue):
+    try:
+        for item in items:
+            queue.put(item)
+    except BaseException as e:
+        queue.put(_StageError(e))
+    else:
+        queue.put(_DONE)
+
+
+def run_pipeline(
+    source: Iterable,
+    stages: List[Callable[[Iterator], Iterable]],
+    maxsize: int = 8,
+) -> Iterator:
+    """Chains generator stages with bounded queues, one thread per stage.
+
+    Every stage takes the previous stage's iterator and yields its own items.
+    Each queue holds at most ``maxsize`` items, so a slow stage applies
+    backpressure upstream instead of letting everything pile up in memory.
+    The last stage's output is yielded to the caller.
+    """
+    queue = Queue(maxsize=maxsize)
+    threads = [Thread(target=_feed, args=(source, queue), daemon=True)]
+
+    for stage in stages:
+        next_queue = Queue(maxsize=maxsize)
+        threads.append(
+            Thread(target=_feed, args=(stage(_drain(queue)), next_queue), daemon=True)
+        )
+        queue = next_queue
+
+    for thread in threads:
+        thread.start()
+
+    yield from _drain(queue)
+
+    for thread in threads:
+        thread.join()
@@ -1,84 +1,266 @@
 from dotenv import load_dotenv
-from langchain.chains.retrieval import create_retrieval_chain
-from langchain import hub
-from langchain.chains.combine_documents import create_stuff_documents_chain
-from langchain_qdrant import QdrantVectorStore
-from qdrant_client import QdrantClient
-from qdrant_client.http.models import VectorParams
-from langchain_core.output_parsers import StrOutputParser
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_groq import ChatGroq
-import torch
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterator, List, Optional
+import threading
+import os
+import sys
+
+# Make the shared modules under src/ and documentation-helper/ importable
+helper_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(helper_dir))
+sys.path.append(helper_dir)
+
+# torch, LangChain, qdrant_client and the models are imported when the service
+# is first built, not when this module is imported by a worker or CLI
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
 
 # Load environment variables
 load_dotenv()
 
-# Set device for HuggingFace model
-device = "cuda" if torch.cuda.is_available() else "cpu"
-
-# Connect to Qdrant
-print("Connecting to Qdrant...")
-qdrant_client = QdrantClient(url="localhost:6334", prefer_grpc=True)
+# Qdrant gRPC URL
+qdrant_url = "localhost:6334"
 
 collection_name = "docs_collection"
-collections = qdrant_client.get_collections()
-print(collections)
-collection_info = qdrant_client.get_collection(collection_name="docs_collection")
-print(collection_info)
-
-# Ensure Qdrant collection exists
-if not qdrant_client.collection_exists(collection_name):
-    print("Collection does not exist. Creating a new collection...")
-    qdrant_client.create_collection(
-        collection_name=collection_name,
-        vectors_config=VectorParams(
-            size=768,  # Default size for all-mpnet-base-v2
-            distance="Cosine"
+
+# Semantic response cache: similarity needed for a hit, entry lifetime (s), max entries
+semantic_cache_enabled = os.getenv("SEMANTIC_CACHE", "1") != "0"
+semantic_cache_threshold = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+semantic_cache_ttl = float(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+semantic_cache_size = int(os.getenv("SEMANTIC_CACHE_SIZE", "1000"))
+
+# Context budget: candidates fetched, chunks and prompt tokens kept, optional cross-encoder.
+# 600-character chunks are ~150 tokens, so the default budget fits three whole chunks
+# (a fourth only once overlap is trimmed), below the 4 chunks stuffed without a budget
+context_budget_enabled = os.getenv("CONTEXT_BUDGET", "1") != "0"
+context_fetch_k = int(os.getenv("CONTEXT_FETCH_K", "20"))
+context_k = int(os.getenv("CONTEXT_K", "4"))
+context_max_tokens = int(os.getenv("CONTEXT_MAX_TOKENS", "480"))
+context_mmr_lambda = float(os.getenv("CONTEXT_MMR_LAMBDA", "0.7"))
+reranker_model = os.getenv("RERANKER_MODEL", "")
+
+# Concurrent retrievals arriving within this window (ms) share one embedding pass and Qdrant call
+retrieval_batch_window_ms = float(os.getenv("RETRIEVAL_BATCH_WINDOW_MS", "5"))
+
+# Fuse dense and BM25 results (RRF) when the collection was ingested with sparse vectors
+hybrid_search = os.getenv("HYBRID_SEARCH", "1") != "0"
+
+def get_device() -> str:
+    """Device for the HuggingFace models."""
+    import torch
+
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+def connect_qdrant():
+    """Connects to Qdrant and makes sure the docs collection exists."""
+    from qdrant_client import AsyncQdrantClient, QdrantClient
+    from collection import create_collection
+
+    print("Connecting to Qdrant...")
+    qdrant_client = QdrantClient(url=qdrant_url, prefer_grpc=True)
+    async_qdrant_client = AsyncQdrantClient(url=qdrant_url, prefer_grpc=True)
+
+    if not qdrant_client.collection_exists(collection_name):
+        print("Collection does not exist. Creating a new collection...")
+        create_collection(
+            qdrant_client,
+            collection_name,
+            vector_size=768,  # Default size for all-mpnet-base-v2
+            sparse=hybrid_search,
+        )
+        print("Collection created.")
+    else:
+        info = qdrant_client.get_collection(collection_name=collection_name)
+        print(f"✅ Collection '{collection_name}': {info.points_count} points ({info.status})")
+    return qdrant_client, async_qdrant_client
+
+class DocsQAService:
+    """Resident retrieval QA service.
+
+    The embedding model, vector store, chat model, prompt and chain are built
+    once and reused for every query instead of being rebuilt per call.
+    """
+
+    def __init__(self):
+        from langchain.chains.retrieval import create_retrieval_chain
+        from langchain.chains.combine_documents import create_stuff_documents_chain
+        from langchain_groq import ChatGroq
+
+        from embeddings.cached import load_embeddings
+        from prompts.registry import load_prompt
+        from collection import SPARSE_VECTOR_NAME, has_sparse_vectors, search_params
+        from caching.semantic import SemanticCache
+        from context import ContextBudgeter, load_cross_encoder
+        from retrieval.bm25 import BM25Encoder
+        from retrieval.qdrant_batch import QdrantBatchRetriever
+
+        device = get_device()
+        qdrant_client, async_qdrant_client = connect_qdrant()
+
+        # Initialize embeddings
+        self.embeddings = load_embeddings(device=device)
+
+        hybrid = hybrid_search and has_sparse_vectors(qdrant_client, collection_name)
+        print(f"🔎 Retrieval mode: {'hybrid dense + BM25' if hybrid else 'dense'}")
+
+        # Batched Qdrant retrieval over the ingested {"text", "source"} payloads;
+        # rescores quantized candidates with the original vectors (no-op without quantization)
+        self.retriever = QdrantBatchRetriever(
+            qdrant_client,
+            collection_name,
+            self.embeddings,
+            k=context_fetch_k if context_budget_enabled else 4,
+            search_params=search_params(),
+            sparse_encoder=BM25Encoder() if hybrid else None,
+            sparse_vector_name=SPARSE_VECTOR_NAME,
+            async_client=async_qdrant_client,
+            window=retrieval_batch_window_ms / 1000,
+            # The budgeter compares candidates with their stored vectors instead of re-embedding them
+            with_vectors=context_budget_enabled,
         )
-    )
-    print("Collection created.")
+
+        # Initialize Chat Model
+        self.chat = ChatGroq(temperature=0, model_name="mixtral-8x7b-32768")
+
+        # Load retrieval QA prompt from the vendored prompt registry
+        retrieval_qa_chat_prompt = load_prompt("langchain-ai/retrieval-qa-chat")
+
+        # Create document combination chain
+        stuff_documents_chain = create_stuff_documents_chain(self.chat, retrieval_qa_chat_prompt)
+
+        # Over-fetch, drop near-duplicates and pack the rest into the token budget
+        retriever = self.retriever.as_retriever()
+        if context_budget_enabled:
+            budgeter = ContextBudgeter(
+                self.embeddings,
+                k=context_k,
+                max_tokens=context_max_tokens,
+                mmr_lambda=context_mmr_lambda,
+                cross_encoder=load_cross_encoder(reranker_model, device) if reranker_model else None,
+            )
+            retriever = budgeter.wrap(self.retriever)
+
+        # Create retrieval chain
+        self.chain = create_retrieval_chain(
+            retriever=retriever,
+            combine_docs_chain=stuff_documents_chain
+        )
+
+        # Answer repeated, near-identical questions without retrieval or LLM calls
+        self.qa = self.chain
+        self.cache = None
+        if semantic_cache_enabled:
+            self.cache = SemanticCache(
+                self.embeddings,
+                threshold=semantic_cache_threshold,
+                ttl=semantic_cache_ttl,
+                max_entries=semantic_cache_size,
+            )
+            self.qa = self.cache.wrap(self.chain)
+
+    def run(self, query: str):
+        """Answers a single query."""
+        return self.qa.invoke(input={"input": query})
+
+    def batch(self, queries: List[str], max_concurrency: int = 4):
+        """Answers several queries concurrently with the same warm chain."""
+        return self.qa.batch(
+            [{"input": query} for query in queries],
+            config={"max_concurrency": max_concurrency},
+        )
+
+    def retrieve(self, queries: List[str], k: Optional[int] = None) -> List[List["Document"]]:
+        """Retrieves documents for many queries in one embedding pass and one Qdrant call.
+
+        With the context budget on, each document also carries its stored vector in ``metadata["_vector"]``.
+        """
+        return self.retriever.search_batch(queries, k)
+
+    async def aretrieve(self, queries: List[str], k: Optional[int] = None) -> List[List["Document"]]:
+        return await self.retriever.asearch_batch(queries, k)
+
+    def stream(self, query: str) -> Iterator[Dict[str, Any]]:
+        """Answers a query incrementally.
+
+        Yields ``{"context": [...]}`` as soon as the documents are retrieved,
+        then ``{"answer": "..."}`` for each token the model produces.
+        """
+        if self.cache is not None:
+            cached = self.cache.lookup(query)
+            if cached is not None:
+                yield {"context": cached["context"]}
+                yield {"answer": cached["answer"]}
+                return
+
+        result = {"context": [], "answer": ""}
+        for chunk in self.chain.stream({"input": query}):
+            if "context" in chunk:
+                result["context"] = chunk["context"]
+                yield {"context": chunk["context"]}
+            if "answer" in chunk:
+                result["answer"] += chunk["answer"]
+                yield {"answer": chunk["answer"]}
+
+        if self.cache is not None:
+            self.cache.update(query, result)
+
+    async def astream(self, query: str) -> AsyncIterator[Dict[str, Any]]:
+        """Async version of ``stream``."""
+        if self.cache is not None:
+            cached = self.cache.lookup(query)
+            if cached is not None:
+                yield {"context": cached["context"]}
+                yield {"answer": cached["answer"]}
+                return
+
+        result = {"context": [], "answer": ""}
+        async for chunk in self.chain.astream({"input": query}):
+            if "context" in chunk:
+                result["context"] = chunk["context"]
+                yield {"context": chunk["context"]}
+            if "answer" in chunk:
+                result["answer"] += chunk["answer"]
+                yield {"answer": chunk["answer"]}
+
+        if self.cache is not None:
+            self.cache.update(query, result)
+
+    async def arun(self, query: str):
+        return await self.qa.ainvoke(input={"input": query})
+
+    async def abatch(self, queries: List[str], max_concurrency: int = 4):
+        return await self.qa.abatch(
+            [{"input": query} for query in queries],
+            config={"max_concurrency": max_concurrency},
+        )
+
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_service() -> DocsQAService:
+    """Returns the process-wide QA service, building it on first use."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = DocsQAService()
+    return _service
 
 def run_llm(query: str):
-    
-    # Initialize embeddings
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-mpnet-base-v2",
-        model_kwargs={"device": device}
-    )
-    
-    # Create vector store with Qdrant
-    docsearch = QdrantVectorStore(
-        client=qdrant_client,
-        collection_name=collection_name,
-        embedding=embeddings,
-    )
-    
-    # Initialize Chat Model
-    chat = ChatGroq(temperature=0, model_name="mixtral-8x7b-32768") 
-    
-    # Load retrieval QA prompt from LangChain hub
-    retrieval_qa_chat_prompt = hub.pull("langchain-ai/retrieval-qa-chat")
-    
-    # Create document combination chain
-    stuff_documents_chain = create_stuff_documents_chain(chat, retrieval_qa_chat_prompt)
-    
-    # Create retrieval chain
-    qa = create_retrieval_chain(
-        retriever=docsearch.as_retriever(), 
-        combine_docs_chain=stuff_documents_chain
-    )
-    
-    # Invoke QA chain
-    result = qa.invoke(input={'input': query})
-    
-    return result
+    return get_service().run(query)
+
+def stream_llm(query: str) -> Iterator[Dict[str, Any]]:
+    """Streaming ``run_llm``: yields the sources first, then answer tokens."""
+    return get_service().stream(query)
+
+def astream_llm(query: str) -> AsyncIterator[Dict[str, Any]]:
+    return get_service().astream(query)
 
 if __name__ == "__main__":
     print("Hello ...")
-    res = run_llm(query="What is Langchain Chain?")
-    
-    # Print output safely
-    if "answer" in res:
-        print(res["answer"])
-    else:
-        print("Full Response:", res)
+    for chunk in stream_llm(query="What is Langchain Chain?"):
+        if "context" in chunk:
+            print(f"📚 Sources: {[doc.metadata.get('source', '') for doc in chunk['context']]}")
+        else:
+            print(chunk["answer"], end="", flush=True)
+    print()
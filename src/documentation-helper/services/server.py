@@ -0,0 +1,111 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+
+from core import get_service
+
+
+def to_json(result: dict) -> dict:
+    """Makes a retrieval chain result JSON serializable."""
+    return {
+        "input": result.get("input"),
+        "answer": result.get("answer"),
+        "sources": [
+            {"source": doc.metadata.get("source", ""), "text": doc.page_content}
+            for doc in result.get("context", [])
+        ],
+    }
+
+
+class QAHandler(BaseHTTPRequestHandler):
+    """Serves the warm QA service.
+
+    ``POST /query`` with ``{"query": "..."}`` answers one question,
+    ``POST /batch`` with ``{"queries": [...]}`` answers several concurrently,
+    ``POST /stream`` with ``{"query": "..."}`` streams newline-delimited JSON:
+    the sources first, then one line per answer token.
+    """
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, query: str):
+        # HTTP/1.0 response without Content-Length: the body ends when the connection closes
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            for chunk in get_service().stream(query):
+                if "context" in chunk:
+                    line = {"sources": to_json({"context": chunk["context"]})["sources"]}
+                else:
+                    line = {"answer": chunk["answer"]}
+                self.wfile.write(json.dumps(line).encode("utf-8") + b"\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as e:
+            print(f"❌ Error streaming answer: {e}")
+            self.wfile.write(json.dumps({"error": str(e)}).encode("utf-8") + b"\n")
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok"})
+        elif self.path == "/stats":
+            cache = get_service().cache
+            self._send(200, {"semantic_cache": cache.stats() if cache else None})
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send(400, {"error": "invalid JSON body"})
+            return
+
+        if self.path == "/stream" and isinstance(body.get("query"), str):
+            self._stream(body["query"])
+            return
+
+        try:
+            if self.path == "/query" and isinstance(body.get("query"), str):
+                self._send(200, to_json(get_service().run(body["query"])))
+            elif self.path == "/batch" and isinstance(body.get("queries"), list):
+                results = get_service().batch(body["queries"])
+                self._send(200, {"results": [to_json(result) for result in results]})
+            else:
+                self._send(400, {"error": "expected /query {query} or /batch {queries}"})
+        except Exception as e:
+            print(f"❌ Error answering request: {e}")
+            self._send(500, {"error": str(e)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the documentation QA chain over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    # Load the model and chain before accepting requests
+    print("⏳ Warming up QA service...")
+    get_service()
+
+    server = ThreadingHTTPServer((args.host, args.port), QAHandler)
+    print(f"✅ Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
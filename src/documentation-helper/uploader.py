@@ -0,0 +1,117 @@
+from itertools import islice
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+import asyncio
+import random
+import time
+
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import PointStruct
+
+
+class AsyncUploader:
+    """Pipelined Qdrant upserts over gRPC.
+
+    Up to ``max_in_flight`` batches are sent concurrently, failed batches are
+    retried with exponential backoff, and the batch size adapts to the
+    observed latency: it grows while round-trips stay well under
+    ``target_latency`` and shrinks when they exceed it or fail.
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        url: str = "localhost:6334",
+        max_in_flight: int = 4,
+        batch_size: int = 50,
+        min_batch_size: int = 16,
+        max_batch_size: int = 1024,
+        target_latency: float = 0.5,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+    ):
+        self.collection_name = collection_name
+        self.url = url
+        self.max_in_flight = max(1, max_in_flight)
+        self.batch_size = batch_size
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.uploaded = 0
+        self.failed = 0
+        self._batches = 0
+
+    def upload(
+        self,
+        items: Iterable[Tuple[PointStruct, Any]],
+        on_uploaded: Optional[Callable[[List[Any]], None]] = None,
+    ) -> int:
+        """Uploads ``(point, tag)`` pairs and returns the number of points stored.
+
+        ``on_uploaded`` receives the tags of every batch once Qdrant has it.
+        The iterator may block (e.g. on a pipeline queue); it is read off the
+        event loop so in-flight requests keep progressing meanwhile.
+        """
+        return asyncio.run(self._upload(iter(items), on_uploaded))
+
+    def _take(self, iterator, size: int) -> list:
+        return list(islice(iterator, size))
+
+    async def _upload(self, iterator, on_uploaded) -> int:
+        client = AsyncQdrantClient(url=self.url, prefer_grpc=True)
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.max_in_flight)
+        tasks = set()
+
+        try:
+            while True:
+                batch = await loop.run_in_executor(None, self._take, iterator, self.batch_size)
+                if not batch:
+                    break
+                await slots.acquire()
+                task = asyncio.create_task(self._send(client, batch, on_uploaded))
+                task.add_done_callback(lambda _: slots.release())
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        finally:
+            await client.close()
+        return self.uploaded
+
+    async def _send(self, client, batch, on_uploaded):
+        self._batches += 1
+        batch_number = self._batches
+        points = [point for point, _ in batch]
+
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                await client.upsert(collection_name=self.collection_name, points=points)
+            except Exception as e:
+                self._resize(shrink=True)
+                if attempt == self.max_retries:
+                    print(f"❌ Error uploading batch {batch_number} after {attempt + 1} attempts: {e}")
+                    self.failed += len(points)
+                    return
+                delay = self.backoff * (2 ** attempt) * (1 + random.random())
+                print(f"⚠ Batch {batch_number} failed ({e}), retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+                continue
+
+            latency = time.perf_counter() - start
+            self._resize(shrink=latency > self.target_latency, grow=latency < self.target_latency / 2)
+            self.uploaded += len(points)
+            if on_uploaded:
+                on_uploaded([tag for _, tag in batch])
+            print(
+                f"✅ Uploaded batch {batch_number} ({len(points)} points in {latency:.2f}s, "
+                f"{self.uploaded} so far, next batch size {self.batch_size})"
+            )
+            return
+
+    def _resize(self, shrink: bool = False, grow: bool = False):
+        if shrink:
+            self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+        elif grow:
+            self.batch_size = min(self.max_batch_size, int(self.batch_size * 1.5))
@@ -0,0 +1,348 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import hashlib
+import os
+import struct
+import threading
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+MODEL_NAME = "sentence-transformers/all-mpnet-base-v2"
+
+DEFAULT_CACHE_DIR = os.getenv(
+    "EMBEDDING_CACHE_DIR", str(Path(__file__).resolve().parents[1] / ".embedding_cache")
+)
+DEFAULT_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+
+# "torch" (HuggingFaceEmbeddings), "onnx" or "onnx-int8" (ONNX Runtime on CPU)
+BACKEND_CHOICES = ["torch", "onnx", "onnx-int8"]
+DEFAULT_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+
+# File header: magic + vector dimension
+_MAGIC = b"EMBC"
+_HEADER = struct.Struct("<4sI")
+
+# Share of entries kept when the cache overflows
+_KEEP_RATIO = 0.8
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive lock on ``path + ".lock"`` across processes.
+
+    ``fcntl.flock`` on POSIX; on Windows ``msvcrt.locking`` on the first byte
+    of the lock file.
+    """
+    with open(f"{path}.lock", "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    # LK_LOCK retries for about 10s before giving up, so keep waiting
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class EmbeddingCache:
+    """Append-only, memory-mapped vector store keyed by 32-byte digests.
+
+    Records are ``(key, float32 vector)`` rows appended to a single file and
+    read back through ``np.memmap``, so lookups never load the whole cache.
+    Several processes (the ingestion workers) and threads (the HTTP server)
+    can share a cache file: the header is created atomically, appends and
+    compaction hold a file lock (``flock``, or ``msvcrt.locking`` on Windows),
+    and each instance serializes its own threads. When the file holds more
+    than ``max_entries`` rows it is compacted down to the most recently used
+    ones. On Windows, compaction is skipped while another process still has
+    the file mapped, and the cache grows until the next attempt succeeds.
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.dim: Optional[int] = None
+        self._index: Dict[bytes, int] = {}
+        self._last_used: Dict[bytes, int] = {}
+        self._tick = 0
+        self._rows = 0
+        self._map = None
+        self._inode = None
+        self._lock = threading.RLock()
+
+        if os.path.exists(path) and self._read_header():
+            self._remap()
+
+    def _read_header(self, warn: bool = True) -> bool:
+        with open(self.path, "rb") as f:
+            header = f.read(_HEADER.size)
+        magic, dim = _HEADER.unpack(header) if len(header) == _HEADER.size else (None, 0)
+        if magic != _MAGIC:
+            if warn:
+                print(f"⚠ Ignoring unreadable embedding cache {self.path}")
+            return False
+        self.dim = dim
+        return True
+
+    def _create(self, dim: int):
+        """Creates the file with its header, or adopts the one another process created."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with _file_lock(self.path):
+            if os.path.exists(self.path) and self._read_header(warn=False):
+                if self.dim != dim:
+                    raise ValueError(f"Embedding cache {self.path} holds {self.dim}-d vectors, got {dim}-d")
+                return
+            # Readers only ever see no file or a complete header
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, dim))
+            os.replace(tmp_path, self.path)
+            self.dim = dim
+
+    def __len__(self):
+        return self._rows
+
+    def _dtype(self) -> np.dtype:
+        return np.dtype([("key", "u1", (32,)), ("vector", "<f4", (self.dim,))])
+
+    def _remap(self):
+        """Picks up records appended since the last look, by us or another process."""
+        stat = os.stat(self.path)
+        rows = (stat.st_size - _HEADER.size) // self._dtype().itemsize
+        if stat.st_ino != self._inode or rows < self._rows:
+            # Compacted or truncated by another process: rows moved, rebuild the index
+            self._inode = stat.st_ino
+            self._index = {}
+            self._rows = 0
+            self._map = None
+        if rows == self._rows and self._map is not None:
+            return
+        self._map = np.memmap(
+            self.path, dtype=self._dtype(), mode="r", offset=_HEADER.size, shape=(rows,)
+        ) if rows else None
+        for row in range(self._rows, rows):
+            self._index[self._map["key"][row].tobytes()] = row
+        self._rows = rows
+
+    def _touch(self, key: bytes):
+        self._tick += 1
+        self._last_used[key] = self._tick
+
+    def get_many(self, keys: Sequence[bytes]) -> List[Optional[List[float]]]:
+        with self._lock:
+            if self.dim is None:
+                if not os.path.exists(self.path) or not self._read_header(warn=False):
+                    return [None] * len(keys)
+            self._remap()
+            vectors = []
+            for key in keys:
+                row = self._index.get(key)
+                if row is None:
+                    vectors.append(None)
+                else:
+                    self._touch(key)
+                    vectors.append(self._map["vector"][row].tolist())
+            return vectors
+
+    def put_many(self, keys: Sequence[bytes], vectors: Sequence[Sequence[float]]):
+        if not keys:
+            return
+        with self._lock:
+            if self.dim is None:
+                self._create(len(vectors[0]))
+
+            with _file_lock(self.path):
+                self._remap()
+                new = {}
+                for key, vector in zip(keys, vectors):
+                    if key not in self._index and key not in new:
+                        new[key] = vector
+                if not new:
+                    return
+
+                records = np.zeros(len(new), dtype=self._dtype())
+                records["key"] = [np.frombuffer(key, dtype="u1") for key in new]
+                records["vector"] = list(new.values())
+                with open(self.path, "ab") as f:
+                    f.write(records.tobytes())
+                for key in new:
+                    self._touch(key)
+                self._remap()
+
+                if self._rows > self.max_entries:
+                    self._evict()
+
+    def _evict(self):
+        """Rewrites the file with the most recently used entries only.
+
+        Called with the file lock held, so no other process appends meanwhile.
+        """
+        keep = int(self.max_entries * _KEEP_RATIO)
+        # Entries never used by this process rank by age (row order)
+        rows = sorted(
+            range(self._rows),
+            key=lambda row: (self._last_used.get(self._map["key"][row].tobytes(), 0), row),
+        )[-keep:]
+        rows.sort()
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, self.dim))
+            for i in range(0, len(rows), 10000):
+                f.write(self._map[rows[i:i + 10000]].tobytes())
+
+        # Release the mapping first, Windows cannot replace a mapped file
+        self._map = None
+        try:
+            os.replace(tmp_path, self.path)
+        except PermissionError as e:
+            # Windows: another process still has the file mapped
+            os.remove(tmp_path)
+            self._remap()
+            print(f"⚠ Embedding cache not compacted, file in use by another process: {e}")
+            return
+        self._remap()
+        self._last_used = {key: tick for key, tick in self._last_used.items() if key in self._index}
+        print(f"🧹 Embedding cache compacted to {self._rows} entries")
+
+
+class CachedEmbeddings(Embeddings):
+    """Wraps an embedding model with a persistent on-disk vector cache.
+
+    Keys are ``sha256(model name + text)``, so texts seen before (in this or
+    any earlier run) skip the model's forward pass. Documents and queries are
+    cached separately since some models embed them differently.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        model_name: str = MODEL_NAME,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.underlying = underlying
+        self.model_name = model_name
+        slug = model_name.replace("/", "__")
+        self.document_cache = EmbeddingCache(os.path.join(cache_dir, f"{slug}.documents.bin"), max_entries)
+        self.query_cache = EmbeddingCache(os.path.join(cache_dir, f"{slug}.queries.bin"), max_entries)
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).digest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        vectors = self.document_cache.get_many(keys)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            computed = self.underlying.embed_documents([texts[i] for i in missing])
+            self.document_cache.put_many([keys[i] for i in missing], computed)
+            for i, vector in zip(missing, computed):
+                vectors[i] = list(vector)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        vector = self.query_cache.get_many([key])[0]
+        if vector is not None:
+            self.hits += 1
+            return vector
+
+        self.misses += 1
+        vector = list(self.underlying.embed_query(text))
+        self.query_cache.put_many([key], [vector])
+        return vector
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embeds many queries, computing the uncached ones in one forward pass."""
+        keys = [self._key(text) for text in texts]
+        vectors = self.query_cache.get_many(keys)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            computed = embed_queries(self.underlying, [texts[i] for i in missing])
+            self.query_cache.put_many([keys[i] for i in missing], computed)
+            for i, vector in zip(missing, computed):
+                vectors[i] = list(vector)
+        return vectors
+
+
+def embed_queries(embeddings: Embeddings, texts: List[str]) -> List[List[float]]:
+    """Batched ``embed_query``.
+
+    Models without query-specific encoding settings embed queries exactly like
+    documents, so those go through ``embed_documents`` in a single batch.
+    """
+    if hasattr(embeddings, "embed_queries"):
+        return embeddings.embed_queries(texts)
+    query_kwargs = getattr(embeddings, "query_encode_kwargs", None)
+    if query_kwargs is not None and query_kwargs in ({}, getattr(embeddings, "encode_kwargs", None)):
+        return embeddings.embed_documents(texts)
+    return [embeddings.embed_query(text) for text in texts]
+
+
+def load_embeddings(
+    model_name: str = MODEL_NAME,
+    device: Optional[str] = None,
+    cache: bool = True,
+    backend: str = DEFAULT_BACKEND,
+    threads: Optional[int] = None,
+) -> Embeddings:
+    """Shared embedding model, cached on disk unless ``EMBEDDING_CACHE=0``.
+
+    ``backend`` (``EMBEDDING_BACKEND``) picks PyTorch ``HuggingFaceEmbeddings``
+    or the ONNX Runtime export of the same model, optionally int8-quantized;
+    the ONNX backends always run on CPU and ignore ``device``. ``threads``
+    caps the CPU threads of the chosen runtime (torch is only imported for
+    the torch backend).
+    """
+    if backend == "torch":
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        if threads:
+            import torch
+
+            torch.set_num_threads(threads)
+
+        embeddings = HuggingFaceEmbeddings(
+            model_name=model_name,
+            model_kwargs={"device": device} if device else {}
+        )
+    elif backend in ("onnx", "onnx-int8"):
+        from embeddings.onnx import OnnxEmbeddings
+
+        embeddings = OnnxEmbeddings(model_name, quantize=backend == "onnx-int8", threads=threads)
+    else:
+        raise ValueError(f"Unknown embedding backend '{backend}', expected one of {BACKEND_CHOICES}")
+
+    if not cache or os.getenv("EMBEDDING_CACHE", "1") == "0":
+        return embeddings
+    # int8 vectors differ slightly from the float ones, so they get their own cache
+    cache_name = f"{model_name}@int8" if backend == "onnx-int8" else model_name
+    return CachedEmbeddings(embeddings, model_name=cache_name)
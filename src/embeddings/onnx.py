@@ -0,0 +1,131 @@
+from pathlib import Path
+from typing import List, Optional
+import os
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_MODEL_DIR = os.getenv(
+    "ONNX_MODEL_DIR", str(Path(__file__).resolve().parents[1] / ".onnx_models")
+)
+
+
+def export_model(model_name: str, model_dir: str = DEFAULT_MODEL_DIR, quantize: bool = True) -> str:
+    """Exports the transformer to ONNX once and returns the model file path.
+
+    With ``quantize`` the weights are converted to int8 with dynamic
+    quantization (activations are quantized per batch at run time), which
+    needs no calibration data. Torch is only imported when exporting.
+    """
+    target = os.path.join(model_dir, model_name.replace("/", "__"))
+    fp32_path = os.path.join(target, "model.onnx")
+    int8_path = os.path.join(target, "model.int8.onnx")
+    path = int8_path if quantize else fp32_path
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(target, exist_ok=True)
+    if not os.path.exists(fp32_path):
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        print(f"📦 Exporting {model_name} to ONNX...")
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModel.from_pretrained(model_name).eval()
+        sample = tokenizer(["an example sentence"], return_tensors="pt")
+        tmp_path = f"{fp32_path}.tmp"
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (sample["input_ids"], sample["attention_mask"]),
+                tmp_path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["last_hidden_state"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "last_hidden_state": {0: "batch", 1: "sequence"},
+                },
+                opset_version=14,
+            )
+        os.replace(tmp_path, fp32_path)
+        tokenizer.save_pretrained(target)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        print(f"📦 Quantizing {model_name} to int8...")
+        tmp_path = f"{int8_path}.tmp"
+        quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+        os.replace(tmp_path, int8_path)
+    return path
+
+
+class OnnxEmbeddings(Embeddings):
+    """Sentence-transformers embedder on ONNX Runtime, for CPU-only nodes.
+
+    Drop-in for ``HuggingFaceEmbeddings`` with the same model: tokenizes,
+    runs the exported transformer, mean-pools over the attention mask and
+    L2-normalizes like the ``all-mpnet-base-v2`` pipeline. Texts are sorted by
+    length before batching so each batch is padded as little as possible.
+    ``threads`` (default ``ONNX_THREADS``, else all cores) caps intra-op threads.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        quantize: bool = True,
+        batch_size: int = 32,
+        max_length: int = 384,
+        threads: Optional[int] = None,
+        model_dir: str = DEFAULT_MODEL_DIR,
+    ):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+
+        path = export_model(model_name, model_dir, quantize=quantize)
+        self.tokenizer = AutoTokenizer.from_pretrained(os.path.dirname(path))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = threads or int(os.getenv("ONNX_THREADS", "0"))
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np",
+        )
+        mask = encoded["attention_mask"].astype(np.int64)
+        hidden = self.session.run(
+            ["last_hidden_state"],
+            {"input_ids": encoded["input_ids"].astype(np.int64), "attention_mask": mask},
+        )[0]
+        weights = mask[..., None].astype(np.float32)
+        pooled = (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        return pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = np.empty((len(texts), 0), dtype=np.float32)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            embedded = self._embed_batch([texts[i] for i in batch])
+            if vectors.shape[1] == 0:
+                vectors = np.empty((len(texts), embedded.shape[1]), dtype=np.float32)
+            vectors[batch] = embedded
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
@@ -1,10 +1,16 @@
 from dotenv import load_dotenv
 from langchain_community.document_loaders import TextLoader
 from langchain_text_splitters import CharacterTextSplitter
-from langchain_huggingface import HuggingFaceEmbeddings
 from qdrant_client import QdrantClient
 from qdrant_client.models import PointStruct
 import torch
+import os
+import sys
+
+# Make the shared modules under src/ importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embeddings.cached import load_embeddings
 
 load_dotenv()
 
@@ -23,13 +29,10 @@ if __name__ == "__main__":
     texts = text_splitter.split_documents(document)
     print(f"Created {len(texts)} chunks")
     
-    embedding = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-mpnet-base-v2",
-        model_kwargs={"device": device}
-    )
+    embedding = load_embeddings(device=device)
     
     print("Generating embeddings...")
-    embeddings = [embedding.embed_query(text.page_content) for text in texts]
+    embeddings = embedding.embed_documents([text.page_content for text in texts])
     
     print("Connecting to Qdrant...")
     qdrant_client = QdrantClient(host="localhost", port=6333)  # Adjust host/port if needed
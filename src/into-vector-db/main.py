@@ -2,16 +2,23 @@ from dotenv import load_dotenv
 
 from langchain_core.prompts import PromptTemplate
 from langchain_groq import ChatGroq
-from langchain_huggingface import HuggingFaceEmbeddings
 
-from langchain import hub
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain.chains.retrieval import create_retrieval_chain
 
-from langchain_qdrant import QdrantVectorStore
 from qdrant_client import QdrantClient
 from qdrant_client.http.models import VectorParams
 from langchain_core.output_parsers import StrOutputParser
+import os
+import sys
+
+# Make the shared modules under src/ importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embeddings.cached import load_embeddings
+from prompts.registry import load_prompt
+from caching.semantic import SemanticCache
+from retrieval.qdrant_batch import QdrantBatchRetriever
 
 
 load_dotenv()
@@ -21,7 +28,7 @@ if __name__=="__main__":
     
     client = QdrantClient(":memory:")
     
-    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-mpnet-base-v2")
+    embeddings = load_embeddings()
     llm = ChatGroq(model_name="mixtral-8x7b-32768")
     
     query = "what is Pinecone in machine learning?"
@@ -30,20 +37,29 @@ if __name__=="__main__":
     # print(result.content)
     
     print("Connecting to Qdrant...")
-    qdrant_client = QdrantClient(host="localhost", port=6333)
+    qdrant_client = QdrantClient(host="localhost", port=6333, prefer_grpc=True)
     
-    vector_store = QdrantVectorStore(
-        client=qdrant_client,
+    # Reads the {"text"} payloads written by ingrestion.py; batches concurrent queries
+    retriever = QdrantBatchRetriever(
+        qdrant_client,
         collection_name="my_collection",
-        embedding=embeddings,
+        embeddings=embeddings,
     )
     
-    retrieval_qa_chat_prompt = hub.pull("langchain-ai/retrieval-qa-chat")
+    retrieval_qa_chat_prompt = load_prompt("langchain-ai/retrieval-qa-chat")
     combine_docs_chain = create_stuff_documents_chain(llm, retrieval_qa_chat_prompt)
     retrival_chain = create_retrieval_chain(
-        retriever=vector_store.as_retriever(), combine_docs_chain=combine_docs_chain
+        retriever=retriever.as_retriever(), combine_docs_chain=combine_docs_chain
+    )
+    
+    # Reuse answers to near-identical questions from earlier runs
+    semantic_cache = SemanticCache(
+        embeddings, path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "semantic_cache.json")
     )
+    retrival_chain = semantic_cache.wrap(retrival_chain)
     
     result = retrival_chain.invoke(input={"input": query})
+    semantic_cache.save()
+    print(semantic_cache.stats())
 
     print(result)
\ No newline at end of file
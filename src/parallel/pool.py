@@ -0,0 +1,12 @@
+import multiprocessing
+
+
+def pool_context():
+    """Start method for process pools: forkserver where available, else spawn.
+
+    Pools are often created from pipeline threads or after torch, FAISS or a
+    model has been loaded, and forking such a process can deadlock or copy
+    large heaps, so workers always start from a clean process.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
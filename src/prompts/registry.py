@@ -0,0 +1,117 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import List
+import argparse
+import json
+import os
+import sys
+
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder, PromptTemplate
+
+# Vendored prompts live in hub/<owner>/<name>.json
+REGISTRY_DIR = Path(os.getenv("PROMPT_REGISTRY_DIR", Path(__file__).resolve().parent / "hub"))
+
+# Prompts the project pulls from the LangChain hub
+KNOWN_PROMPTS = [
+    "langchain-ai/retrieval-qa-chat",
+    "hwchase17/react",
+]
+
+_ROLES = {
+    "SystemMessagePromptTemplate": "system",
+    "HumanMessagePromptTemplate": "human",
+    "AIMessagePromptTemplate": "ai",
+}
+
+
+def prompt_path(repo: str) -> Path:
+    owner, name = repo.split("/", 1)
+    return REGISTRY_DIR / owner / f"{name}.json"
+
+
+@lru_cache(maxsize=None)
+def load_prompt(repo: str):
+    """Offline replacement for ``hub.pull(repo)``.
+
+    Reads the vendored copy of the prompt, once per process.
+    """
+    path = prompt_path(repo)
+    if not path.exists():
+        raise FileNotFoundError(
+            f"Prompt '{repo}' is not vendored at {path}. "
+            f"Run `python src/prompts/registry.py sync {repo}` on a machine with network access."
+        )
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    if data["type"] == "chat":
+        return ChatPromptTemplate.from_messages([tuple(message) for message in data["messages"]])
+    return PromptTemplate.from_template(data["template"])
+
+
+def to_record(repo: str, prompt, version: int) -> dict:
+    """Converts a pulled hub prompt into the registry file format."""
+    record = {
+        "repo": repo,
+        "version": version,
+        "commit": (prompt.metadata or {}).get("lc_hub_commit_hash"),
+    }
+    if isinstance(prompt, ChatPromptTemplate):
+        messages = []
+        for message in prompt.messages:
+            if isinstance(message, MessagesPlaceholder):
+                messages.append(["placeholder", f"{{{message.variable_name}}}"])
+            else:
+                messages.append([_ROLES[type(message).__name__], message.prompt.template])
+        record.update(type="chat", messages=messages)
+    else:
+        record.update(type="string", template=prompt.template)
+    return record
+
+
+def sync(repos: List[str]):
+    """Pulls prompts from the hub and refreshes the vendored copies."""
+    from langchain import hub
+
+    for repo in repos:
+        path = prompt_path(repo)
+        previous = {}
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                previous = json.load(f)
+
+        record = to_record(repo, hub.pull(repo), version=previous.get("version", 0))
+        if {k: v for k, v in record.items() if k != "version"} == \
+                {k: v for k, v in previous.items() if k != "version"}:
+            print(f"✅ {repo} is up to date (v{record['version']})")
+            continue
+
+        record["version"] += 1
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+            f.write("\n")
+        print(f"🔄 Updated {repo} to v{record['version']}")
+
+    load_prompt.cache_clear()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vendored LangChain hub prompts.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    sync_parser = subparsers.add_parser("sync", help="refresh vendored prompts from the hub")
+    sync_parser.add_argument("repos", nargs="*", default=KNOWN_PROMPTS)
+    subparsers.add_parser("list", help="list vendored prompts")
+    args = parser.parse_args(argv)
+
+    if args.command == "sync":
+        sync(args.repos)
+    else:
+        for path in sorted(REGISTRY_DIR.glob("*/*.json")):
+            with open(path, encoding="utf-8") as f:
+                record = json.load(f)
+            print(f"{record['repo']} v{record['version']} ({record.get('commit') or 'no commit'})")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,318 @@
-from typing import Dict, Any, List
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional
+from uuid import UUID
+import atexit
+import json
+import os
+import random
+import threading
+import time
 
-from langchain.callbacks.base import BaseCallbackHandler
+from langchain.callbacks.base import AsyncCallbackHandler, BaseCallbackHandler
 from langchain.schema import LLMResult
 
-class AgentCallbackHandler(BaseCallbackHandler):
+DEFAULT_TRACE_PATH = os.getenv(
+    "AGENT_TRACE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "agent_traces.jsonl")
+)
+# Share of LLM calls written to the trace file; totals always cover every call
+DEFAULT_SAMPLE_RATE = float(os.getenv("AGENT_TRACE_SAMPLE_RATE", "1.0"))
+# Also write prompt and response text of sampled calls
+DEFAULT_INCLUDE_TEXT = os.getenv("AGENT_TRACE_TEXT", "0") == "1"
+
+
+class LLMCall(NamedTuple):
+    """One finished LLM call, as captured on the request path (no formatting yet)."""
+
+    run_id: UUID
+    model: Optional[str]
+    started_at: float
+    latency_s: float
+    prompts: List[Any]
+    response: Optional[LLMResult]
+    error: Optional[str]
+    sampled: bool
+    include_text: bool
+
+
+def _prompt_chars(prompts: List[Any]) -> int:
+    total = 0
+    for prompt in prompts:
+        if isinstance(prompt, str):
+            total += len(prompt)
+        else:
+            # Chat models pass a list of messages per prompt
+            total += sum(len(str(message.content)) for message in prompt)
+    return total
+
+
+def _prompt_text(prompts: List[Any]) -> List[str]:
+    return [
+        prompt if isinstance(prompt, str) else "\n".join(f"{m.type}: {m.content}" for m in prompt)
+        for prompt in prompts
+    ]
+
+
+def _token_usage(response: LLMResult) -> Dict[str, Optional[int]]:
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if not usage and response.generations and response.generations[0]:
+        # Newer chat models report usage on the message instead
+        metadata = getattr(getattr(response.generations[0][0], "message", None), "usage_metadata", None) or {}
+        usage = {
+            "prompt_tokens": metadata.get("input_tokens"),
+            "completion_tokens": metadata.get("output_tokens"),
+        }
+    return {
+        "prompt_tokens": usage.get("prompt_tokens"),
+        "completion_tokens": usage.get("completion_tokens"),
+    }
+
+
+def _event(call: LLMCall) -> Dict[str, Any]:
+    event = {
+        "run_id": str(call.run_id),
+        "model": call.model,
+        "timestamp": call.started_at,
+        "latency_ms": round(call.latency_s * 1000, 3),
+        "prompt_chars": _prompt_chars(call.prompts),
+        "prompt_tokens": None,
+        "completion_tokens": None,
+        "output_chars": 0,
+        "error": call.error,
+    }
+    if call.response is not None:
+        event.update(_token_usage(call.response))
+        event["output_chars"] = sum(
+            len(generation.text) for generations in call.response.generations for generation in generations
+        )
+    if call.include_text and call.sampled:
+        event["prompts"] = _prompt_text(call.prompts)
+        if call.response is not None:
+            event["outputs"] = [
+                generation.text for generations in call.response.generations for generation in generations
+            ]
+    return event
+
+
+class TraceWriter:
+    """Turns ``LLMCall`` records into JSONL trace lines on a background thread.
+
+    ``emit`` never blocks: records go on a bounded queue and are dropped (and
+    counted in ``dropped``) when it is full. The queue is a plain deque the
+    thread drains every ``flush_interval`` seconds, so emitting takes no lock
+    and does not wake the thread per call. Token usage, sizes and the JSON
+    encoding are all worked out on the writer thread, which also keeps
+    running totals over every call, sampled or not.
+    """
+
+    def __init__(self, path: str = DEFAULT_TRACE_PATH, max_queue: int = 10000, flush_interval: float = 0.1):
+        self.path = path
+        self.max_queue = max_queue
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self.totals = {
+            "calls": 0,
+            "errors": 0,
+            "latency_ms": 0.0,
+            "prompt_chars": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+        }
+        self._queue: "deque[LLMCall]" = deque()
+        self._stop = threading.Event()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def emit(self, call: LLMCall):
+        # deque.append is atomic; the length check may overshoot by a few under races.
+        # After close nothing drains the queue, so those calls count as dropped too
+        if len(self._queue) >= self.max_queue or self._stop.is_set():
+            self.dropped += 1
+        else:
+            self._queue.append(call)
+
+    def _record(self, event: Dict[str, Any]):
+        self.totals["calls"] += 1
+        self.totals["errors"] += event["error"] is not None
+        self.totals["latency_ms"] += event["latency_ms"]
+        self.totals["prompt_chars"] += event["prompt_chars"]
+        self.totals["prompt_tokens"] += event["prompt_tokens"] or 0
+        self.totals["completion_tokens"] += event["completion_tokens"] or 0
+
+    def _drain(self, file):
+        lines = []
+        while self._queue:
+            call = self._queue.popleft()
+            try:
+                event = _event(call)
+            except Exception as e:
+                print(f"⚠ Could not trace LLM call {call.run_id}: {e}")
+                continue
+            self._record(event)
+            if call.sampled:
+                lines.append(json.dumps(event, default=str) + "\n")
+        if not lines:
+            return file
+        if file is None:
+            file = open(self.path, "a", encoding="utf-8")
+        file.writelines(lines)
+        file.flush()
+        self.written += len(lines)
+        return file
+
+    def _run(self):
+        file = None
+        try:
+            while not self._stop.wait(self.flush_interval):
+                file = self._drain(file)
+            file = self._drain(file)
+        finally:
+            if file is not None:
+                file.close()
+            self._closed.set()
+
+    def close(self, timeout: float = 5.0):
+        """Writes what is queued and stops the thread.
+
+        Only for writers you created: the shared ``trace_writer()`` one is
+        closed at exit. Calls emitted after closing are counted in ``dropped``.
+        """
+        self._stop.set()
+        if not self._closed.wait(timeout):
+            print(f"⚠ Trace writer still busy, {len(self._queue)} events not written")
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.totals["calls"]
+        return {
+            **self.totals,
+            "avg_latency_ms": self.totals["latency_ms"] / calls if calls else 0.0,
+            "written": self.written,
+            "dropped": self.dropped,
+            "queued": len(self._queue),
+        }
+
+
+@lru_cache(maxsize=None)
+def trace_writer(path: str = DEFAULT_TRACE_PATH) -> TraceWriter:
+    """Process-wide writer, so every handler appends to the same file through one thread."""
+    return TraceWriter(path)
+
+
+class _TraceRecorder:
+    """Request-path half of the handlers: timestamps and hand-off only."""
+
+    # The hooks never block, so LangChain can call them inline instead of in an executor
+    run_inline = True
+
+    def __init__(
+        self,
+        writer: Optional[TraceWriter] = None,
+        sample_rate: float = DEFAULT_SAMPLE_RATE,
+        include_text: bool = DEFAULT_INCLUDE_TEXT,
+    ):
+        super().__init__()
+        self.writer = writer or trace_writer()
+        self.sample_rate = sample_rate
+        self.include_text = include_text
+        self._runs: Dict[UUID, tuple] = {}
+        # Time spent inside the hooks themselves, i.e. what tracing adds to each call
+        self.hook_calls = 0
+        self.hook_seconds = 0.0
+
+    def _start(self, run_id: UUID, prompts: List[Any], kwargs: Dict[str, Any]):
+        now = time.perf_counter()
+        params = kwargs.get("invocation_params") or {}
+        self._runs[run_id] = (
+            now,
+            time.time(),
+            params.get("model_name") or params.get("model"),
+            prompts,
+            random.random() < self.sample_rate,
+        )
+        self.hook_calls += 1
+        self.hook_seconds += time.perf_counter() - now
+
+    def _end(self, run_id: UUID, response: Optional[LLMResult] = None, error: Optional[BaseException] = None):
+        now = time.perf_counter()
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        started, started_at, model, prompts, sampled = run
+        self.writer.emit(
+            LLMCall(
+                run_id=run_id,
+                model=model,
+                started_at=started_at,
+                latency_s=now - started,
+                prompts=prompts,
+                response=response,
+                error=None if error is None else repr(error),
+                sampled=sampled,
+                include_text=self.include_text,
+            )
+        )
+        self.hook_calls += 1
+        self.hook_seconds += time.perf_counter() - now
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.writer.stats(),
+            "hook_us_per_call": self.hook_seconds / self.hook_calls * 1e6 if self.hook_calls else 0.0,
+        }
+
+
+class AgentCallbackHandler(_TraceRecorder, BaseCallbackHandler):
+    """Traces each LLM call (latency, token counts, prompt size) to JSONL.
+
+    Nothing is printed or written on the calling thread: the hooks record a
+    timestamp and queue the call for the ``TraceWriter`` thread. A share
+    ``sample_rate`` of the calls is written to the file (``AGENT_TRACE_PATH``);
+    prompt/response text only with ``include_text``.
+    """
+
     def on_llm_start(
-        self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any
+        self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any
     ) -> Any:
         """Run when LLM starts running."""
-        print(f"***Prompt to LLM was:***\n{prompts[0]}")
-        print("*********")
+        self._start(run_id, prompts, kwargs)
+
+    def on_chat_model_start(
+        self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any
+    ) -> Any:
+        """Run when a chat model starts running."""
+        self._start(run_id, messages, kwargs)
 
-    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> Any:
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> Any:
         """Run when LLM ends running."""
-        print(f"***LLM Response:***\n{response.generations[0][0].text}")
-        print("*********")
\ No newline at end of file
+        self._end(run_id, response=response)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> Any:
+        """Run when LLM errors."""
+        self._end(run_id, error=error)
+
+
+class AsyncAgentCallbackHandler(_TraceRecorder, AsyncCallbackHandler):
+    """``AgentCallbackHandler`` for ``ainvoke``/``astream``: same hooks as coroutines.
+
+    They do not await anything, so the event loop is never handed to the
+    writer; it only pays for the queue hand-off.
+    """
+
+    async def on_llm_start(
+        self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._start(run_id, prompts, kwargs)
+
+    async def on_chat_model_start(
+        self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._start(run_id, messages, kwargs)
+
+    async def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, response=response)
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error=error)
@@ -0,0 +1,230 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import asyncio
+import json
+import os
+import re
+import threading
+
+from langchain.agents.output_parsers import ReActSingleInputOutputParser
+from langchain.schema import AgentAction, AgentFinish
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool
+
+from scratchpad import Scratchpad
+
+FINAL_ANSWER = "Final Answer:"
+ACTION_PATTERN = re.compile(
+    r"Action\s*\d*\s*:[\s]*(.*?)[\s]*Action\s*\d*\s*Input\s*\d*\s*:[\s]*(.*?)"
+    r"(?=\n\s*(?:Thought\s*:|Action\s*\d*\s*:)|\Z)",
+    re.DOTALL,
+)
+
+
+class MultiActionOutputParser(ReActSingleInputOutputParser):
+    """ReAct parser that also accepts several Action/Action Input pairs in one step.
+
+    Returns ``AgentFinish`` or a list of ``AgentAction``; the first action's
+    log carries the model's thought, so the scratchpad keeps it once.
+    """
+
+    def parse(self, text: str) -> Union[List[AgentAction], AgentFinish]:
+        matches = list(ACTION_PATTERN.finditer(text))
+        if len(matches) <= 1 or FINAL_ANSWER in text:
+            step = super().parse(text)
+            return step if isinstance(step, AgentFinish) else [step]
+
+        actions = []
+        start = 0
+        for match in matches:
+            tool_input = match.group(2).strip().strip('"')
+            actions.append(AgentAction(match.group(1).strip(), tool_input, text[start:match.end()]))
+            start = match.end()
+        return actions
+
+    @property
+    def _type(self) -> str:
+        return "react-multi-action"
+
+
+class StepCache:
+    """Memoizes tool observations by ``(tool name, tool input)``.
+
+    Kept in memory for the run and, with ``path``, in a JSON file so later
+    runs reuse them too. Only use it for tools whose output depends on the
+    input alone.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._entries: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠ Could not read step cache {path}: {e}")
+
+    @staticmethod
+    def _key(tool: str, tool_input: Any) -> str:
+        return json.dumps([tool, tool_input], sort_keys=True, default=str)
+
+    def get(self, tool: str, tool_input: Any) -> Optional[str]:
+        with self._lock:
+            observation = self._entries.get(self._key(tool, tool_input))
+            if observation is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return observation
+
+    def put(self, tool: str, tool_input: Any, observation: str):
+        with self._lock:
+            self._entries[self._key(tool, tool_input)] = observation
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+
+
+class ReActExecutor:
+    """Runs a ReAct agent until it answers or ``max_iterations`` steps are used.
+
+    ``agent`` takes ``{"input", "agent_scratchpad"}`` (the intermediate steps)
+    and returns an ``AgentAction``, a list of them or an ``AgentFinish``.
+    Tools are looked up by name in a dict, independent actions proposed in
+    the same step run concurrently (up to ``max_workers``), and observations
+    of ``cacheable`` tools (all tools by default) are memoized in ``step_cache``.
+    Call ``close`` (or use it as a context manager) to stop the tool threads.
+    Steps are kept in a ``Scratchpad``, so ``format_scratchpad`` only renders
+    new ones; ``max_observation_chars`` caps each observation in the prompt.
+    """
+
+    def __init__(
+        self,
+        agent: Runnable,
+        tools: Sequence[BaseTool],
+        max_iterations: int = 10,
+        max_workers: int = 4,
+        step_cache: Optional[StepCache] = None,
+        cacheable: Optional[Sequence[str]] = None,
+        max_observation_chars: Optional[int] = None,
+    ):
+        self.agent = agent
+        self.tools: Dict[str, BaseTool] = {tool.name: tool for tool in tools}
+        self.max_iterations = max_iterations
+        self.max_workers = max_workers
+        self.step_cache = step_cache
+        self.cacheable = set(self.tools if cacheable is None else cacheable)
+        self.max_observation_chars = max_observation_chars
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> "ReActExecutor":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def _as_actions(step) -> Union[List[AgentAction], AgentFinish]:
+        return step if isinstance(step, (list, AgentFinish)) else [step]
+
+    def _invalid(self, action: AgentAction) -> str:
+        return f"{action.tool} is not a valid tool, try one of [{', '.join(self.tools)}]."
+
+    def _cached(self, action: AgentAction) -> Optional[str]:
+        if self.step_cache is None or action.tool not in self.cacheable:
+            return None
+        return self.step_cache.get(action.tool, action.tool_input)
+
+    def _remember(self, action: AgentAction, observation: str):
+        if self.step_cache is not None and action.tool in self.cacheable:
+            self.step_cache.put(action.tool, action.tool_input, observation)
+
+    def _run_tool(self, action: AgentAction) -> str:
+        tool = self.tools.get(action.tool)
+        if tool is None:
+            return self._invalid(action)
+        cached = self._cached(action)
+        if cached is not None:
+            return cached
+        try:
+            observation = str(tool.invoke(action.tool_input))
+        except Exception as e:
+            # Let the model see the error and try something else
+            return f"Error: {e}"
+        self._remember(action, observation)
+        return observation
+
+    async def _arun_tool(self, action: AgentAction) -> str:
+        tool = self.tools.get(action.tool)
+        if tool is None:
+            return self._invalid(action)
+        cached = self._cached(action)
+        if cached is not None:
+            return cached
+        try:
+            observation = str(await tool.ainvoke(action.tool_input))
+        except Exception as e:
+            return f"Error: {e}"
+        self._remember(action, observation)
+        return observation
+
+    @staticmethod
+    def _key(action: AgentAction) -> Tuple[str, str]:
+        return action.tool, json.dumps(action.tool_input, sort_keys=True, default=str)
+
+    def _execute(self, actions: List[AgentAction]) -> List[Tuple[AgentAction, str]]:
+        # Repeated (tool, input) pairs within a step run once
+        unique = {self._key(action): action for action in actions}
+        if len(unique) == 1:
+            results = {key: self._run_tool(action) for key, action in unique.items()}
+        else:
+            futures = {key: self._pool.submit(self._run_tool, action) for key, action in unique.items()}
+            results = {key: future.result() for key, future in futures.items()}
+        return [(action, results[self._key(action)]) for action in actions]
+
+    async def _aexecute(self, actions: List[AgentAction]) -> List[Tuple[AgentAction, str]]:
+        unique = {self._key(action): action for action in actions}
+        observations = await asyncio.gather(*(self._arun_tool(action) for action in unique.values()))
+        results = dict(zip(unique, observations))
+        return [(action, results[self._key(action)]) for action in actions]
+
+    def _stopped(self, intermediate_steps) -> Dict[str, Any]:
+        return {
+            "output": "Agent stopped due to iteration limit.",
+            "intermediate_steps": intermediate_steps,
+        }
+
+    def invoke(self, input: str) -> Dict[str, Any]:
+        intermediate_steps = Scratchpad(max_observation_chars=self.max_observation_chars)
+        for _ in range(self.max_iterations):
+            step = self._as_actions(
+                self.agent.invoke({"input": input, "agent_scratchpad": intermediate_steps})
+            )
+            if isinstance(step, AgentFinish):
+                return {**step.return_values, "intermediate_steps": intermediate_steps}
+            intermediate_steps.extend(self._execute(step))
+        return self._stopped(intermediate_steps)
+
+    async def ainvoke(self, input: str) -> Dict[str, Any]:
+        intermediate_steps = Scratchpad(max_observation_chars=self.max_observation_chars)
+        for _ in range(self.max_iterations):
+            step = self._as_actions(
+                await self.agent.ainvoke({"input": input, "agent_scratchpad": intermediate_steps})
+            )
+            if isinstance(step, AgentFinish):
+                return {**step.return_values, "intermediate_steps": intermediate_steps}
+            intermediate_steps.extend(await self._aexecute(step))
+        return self._stopped(intermediate_steps)
@@ -1,15 +1,19 @@
 from dotenv import load_dotenv
-from langchain.agents import tool, Tool
-from langchain_core.prompts import PromptTemplate
+from langchain.agents import tool
 from langchain.tools.render import render_text_description
 from langchain_groq import ChatGroq
-from langchain.agents.output_parsers import ReActSingleInputOutputParser
-from langchain.schema import AgentAction, AgentFinish
-from langchain.agents.format_scratchpad import format_log_to_str
 
-from typing import Union
+import os
+import sys
 
-from callbacks import AgentCallbackHandler
+from callbacks import AgentCallbackHandler, TraceWriter
+from executor import MultiActionOutputParser, ReActExecutor, StepCache
+from scratchpad import format_scratchpad, prefix_cached_prompt
+
+# Make the shared modules under src/ importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from caching.llm import llm_cache
 
 load_dotenv()
 
@@ -22,12 +26,14 @@ def get_text_length(text: str) -> int:
     # text = text.split("\n").strip('"')
     return len(text)
 
-def find_tool_by_name(tools: list[Tool], tool_name:str)->Tool:
-    for tool in tools:
-        if tool.name == tool_name:
-            return tool
-    raise ValueError(f"Tool with name {tool}")
-            
+# Max Thought/Action rounds per question
+max_iterations = int(os.getenv("REACT_MAX_ITERATIONS", "10"))
+
+# Longest observation kept in the prompt (0 = no limit)
+max_observation_chars = int(os.getenv("REACT_MAX_OBSERVATION_CHARS", "0")) or None
+
+# Tool observations memoized across runs
+step_cache_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "step_cache.json")
 
 if __name__=="__main__":
     print("Hello ReAct LangChain")
@@ -47,6 +53,7 @@ if __name__=="__main__":
     Action Input: the input to the action
     Observation: the result of the action
     ... (this Thought/Action/Action Input/Observation can repeat N times)
+    If several actions do not depend on each other, list each Action/Action Input pair before the Observation.
     Thought: I now know the final answer
     Final Answer: the final answer to the original input question
     
@@ -56,52 +63,52 @@ if __name__=="__main__":
     Thought: {agent_scratchpad}
     """
     
-    prompt = PromptTemplate.from_template(template=template).partial(
+    # Instructions and tools block rendered once; each step only formats the question and scratchpad
+    prompt = prefix_cached_prompt(
+        template,
         tools=render_text_description(tools),
         tool_names=", ".join([t.name for t in tools]),
     )
     
+    # Latency/token traces go to agent_traces.jsonl from a background thread
+    # Own writer rather than the process-wide one, so closing it below affects nothing else
+    trace_file = TraceWriter()
+    trace_handler = AgentCallbackHandler(trace_file)
     llm = ChatGroq(temperature=0, 
                    stop=["\nObservation", "Observation"],
-                   callbacks=[AgentCallbackHandler()],
+                   callbacks=[trace_handler],
+                   cache=llm_cache(),
                    model_name="mixtral-8x7b-32768")
     
     agent = (
         {
             "input": lambda x: x["input"],
-            "agent_scratchpad" : lambda x: format_log_to_str(x["agent_scratchpad"]),
+            "agent_scratchpad" : lambda x: format_scratchpad(x["agent_scratchpad"]),
         }
         | prompt
         | llm
-        | ReActSingleInputOutputParser()
-    )
-    
-    intermediate_steps = []
-    
-    agent_step: Union[AgentAction, AgentFinish] = agent.invoke(
-        {
-            "input": "What is the length of 'DOG' in characters?",
-            "agent_scratchpad": intermediate_steps,
-        }
+        | MultiActionOutputParser()
     )
-    print(agent_step)
     
-    if isinstance(agent_step, AgentAction):
-        tool_name = agent_step.tool
-        tool_to_use = find_tool_by_name(tools, tool_name)
-        tool_input = agent_step.tool_input
-        
-        observation = tool_to_use.func(str(tool_input))
-        print(f"{observation=}")
-        intermediate_steps.append((agent_step, str(observation)))
-        
-    agent_step: Union[AgentAction, AgentFinish] = agent.invoke(
-        {
-            "input": "What is the length of the word: DOG",
-            "agent_scratchpad": intermediate_steps,
-        }
+    step_cache = StepCache(step_cache_path)
+    with ReActExecutor(
+        agent,
+        tools,
+        max_iterations=max_iterations,
+        step_cache=step_cache,
+        max_observation_chars=max_observation_chars,
+    ) as executor:
+        result = executor.invoke("What is the length of 'DOG' in characters?")
+    step_cache.save()
+    print(result["intermediate_steps"])
+    print("### AgentFinish ###")
+    print(result["output"])
+
+    # Write out what is queued so the totals cover every call
+    trace_file.close()
+    stats = trace_handler.stats()
+    print(
+        f"📊 {stats['calls']} LLM call(s), avg {stats['avg_latency_ms']:.0f}ms, "
+        f"{stats['prompt_tokens']}+{stats['completion_tokens']} tokens, "
+        f"tracing {stats['hook_us_per_call']:.1f}µs/hook"
     )
-    print(agent_step)
-    if isinstance(agent_step, AgentFinish):
-        print("### AgentFinish ###")
-        print(agent_step.return_values)
\ No newline at end of file
@@ -0,0 +1,101 @@
+from string import Formatter
+from typing import Any, Dict, Optional
+
+from langchain_core.prompt_values import StringPromptValue
+from langchain_core.runnables import Runnable, RunnableLambda
+
+
+def _format_step(action, observation: str, max_observation_chars: Optional[int]) -> str:
+    observation = str(observation)
+    if max_observation_chars is not None and len(observation) > max_observation_chars:
+        observation = f"{observation[:max_observation_chars]}... [truncated]"
+    # Same layout as langchain's format_log_to_str
+    return f"{action.log}\nObservation: {observation}\nThought: "
+
+
+class Scratchpad(list):
+    """Intermediate steps that keep their ReAct rendering up to date.
+
+    A drop-in for the ``intermediate_steps`` list: ``text`` only formats the
+    steps appended since it was last read, instead of re-running
+    ``format_log_to_str`` over the whole history every iteration (quadratic
+    in the number of steps). Any other change to the list falls back to a
+    full render. ``max_observation_chars`` shortens long
+    observations in the rendered text (not in the steps themselves) to keep
+    prompts small on long runs.
+    """
+
+    def __init__(self, steps=(), max_observation_chars: Optional[int] = None):
+        super().__init__(steps)
+        self.max_observation_chars = max_observation_chars
+        self._rendered = 0
+        self._text = ""
+
+    def _reset(self):
+        self._rendered, self._text = 0, ""
+
+    @property
+    def text(self) -> str:
+        if self._rendered < len(self):
+            self._text += "".join(
+                _format_step(action, observation, self.max_observation_chars)
+                for action, observation in self[self._rendered:]
+            )
+            self._rendered = len(self)
+        return self._text
+
+
+def _invalidating(name: str):
+    def method(self, *args, **kwargs):
+        self._reset()
+        return getattr(list, name)(self, *args, **kwargs)
+
+    method.__name__ = name
+    return method
+
+
+# Only append/extend/+= keep the rendered text valid
+for _name in ("__setitem__", "__delitem__", "__imul__", "insert", "pop", "remove", "clear", "sort", "reverse"):
+    setattr(Scratchpad, _name, _invalidating(_name))
+
+
+def format_scratchpad(steps) -> str:
+    """``agent_scratchpad`` value for a ReAct prompt; incremental for a ``Scratchpad``."""
+    if isinstance(steps, Scratchpad):
+        return steps.text
+    return "".join(_format_step(action, observation, None) for action, observation in steps)
+
+
+def _field(name: str, spec: str, conversion: Optional[str]) -> str:
+    return "{" + name + (f"!{conversion}" if conversion else "") + (f":{spec}" if spec else "") + "}"
+
+
+def prefix_cached_prompt(template: str, **static: str) -> Runnable:
+    """ReAct prompt whose static part is rendered once.
+
+    Everything before the first per-call variable (the instructions and the
+    ``tools``/``tool_names`` block given in ``static``) is formatted up
+    front; each call only formats the short remainder and concatenates. The
+    prefix is byte-identical on every call, which is also what provider-side
+    prompt caches key on.
+    """
+    prefix_parts, suffix_parts = [], []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        if suffix_parts:
+            # Re-escape the literal text, it is formatted again on every call
+            suffix_parts.append(literal.replace("{", "{{").replace("}", "}}"))
+            if field is not None:
+                suffix_parts.append(_field(field, spec, conversion))
+            continue
+        prefix_parts.append(literal)
+        if field in static:
+            prefix_parts.append(_field("0", spec, conversion).format(static[field]))
+        elif field is not None:
+            suffix_parts.append(_field(field, spec, conversion))
+    prefix = "".join(prefix_parts)
+    suffix = "".join(suffix_parts)
+
+    def render(inputs: Dict[str, Any]) -> StringPromptValue:
+        return StringPromptValue(text=prefix + suffix.format(**static, **inputs))
+
+    return RunnableLambda(render)
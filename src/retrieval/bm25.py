@@ -0,0 +1,82 @@
+from collections import Counter
+from typing import List
+import os
+import re
+import zlib
+
+from qdrant_client import models
+
+# Identifiers (snake_case, CamelCase, dotted paths are split on the dots) and numbers
+TOKEN_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+CAMEL_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were "
+    "will with you your can not but if into then there these they their which when what how".split()
+)
+
+# Average chunk length in tokens (600-char chunks), used for BM25 length normalization
+DEFAULT_AVG_LEN = float(os.getenv("BM25_AVG_LEN", "90"))
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms, keeping whole identifiers as well as their parts.
+
+    ``RecursiveCharacterTextSplitter`` yields the exact-name term
+    ``recursivecharactertextsplitter`` plus ``recursive``, ``character``,
+    ``text`` and ``splitter``, so both API-name and natural-language queries
+    match.
+    """
+    terms = []
+    for token in TOKEN_PATTERN.findall(text):
+        lowered = token.lower()
+        parts = [part.lower() for piece in token.split("_") for part in CAMEL_PATTERN.findall(piece)]
+        if len(parts) > 1 or lowered not in STOPWORDS:
+            terms.append(lowered)
+        if len(parts) > 1:
+            terms.extend(part for part in parts if part not in STOPWORDS)
+    return terms
+
+
+def term_index(term: str) -> int:
+    """Stable sparse vector index for a term (independent of corpus and process)."""
+    return zlib.crc32(term.encode("utf-8"))
+
+
+class BM25Encoder:
+    """Encodes text as Qdrant sparse vectors for BM25 scoring.
+
+    Documents carry the BM25 term-frequency component; queries carry a 1 per
+    term. The IDF component is computed by Qdrant from the collection itself
+    (sparse vector params with ``Modifier.IDF``), so nothing has to be fitted
+    on the corpus up front and incremental ingestion keeps scores correct.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, avg_len: float = DEFAULT_AVG_LEN):
+        self.k1 = k1
+        self.b = b
+        self.avg_len = avg_len
+
+    @staticmethod
+    def _sparse(weights: dict) -> models.SparseVector:
+        # Distinct terms can collide on an index; merge their weights
+        merged = Counter()
+        for term, weight in weights.items():
+            merged[term_index(term)] += weight
+        return models.SparseVector(indices=list(merged), values=[float(v) for v in merged.values()])
+
+    def encode_document(self, text: str) -> models.SparseVector:
+        terms = tokenize(text)
+        norm = self.k1 * (1 - self.b + self.b * len(terms) / self.avg_len)
+        return self._sparse(
+            {term: tf * (self.k1 + 1) / (tf + norm) for term, tf in Counter(terms).items()}
+        )
+
+    def encode_query(self, text: str) -> models.SparseVector:
+        return self._sparse({term: 1.0 for term in tokenize(text)})
+
+    def encode_documents(self, texts: List[str]) -> List[models.SparseVector]:
+        return [self.encode_document(text) for text in texts]
+
+    def encode_queries(self, texts: List[str]) -> List[models.SparseVector]:
+        return [self.encode_query(text) for text in texts]
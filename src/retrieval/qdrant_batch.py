@@ -0,0 +1,223 @@
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import queue
+import threading
+import time
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import Runnable, RunnableLambda
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
+
+from embeddings.cached import embed_queries
+from retrieval.bm25 import BM25Encoder
+
+
+class QdrantBatchRetriever:
+    """Retrieves documents for many queries with one embedding pass and one Qdrant call.
+
+    ``search_batch``/``asearch_batch`` embed all queries together and send
+    them as a single ``query_batch_points`` request. ``invoke``/``ainvoke``
+    answer one query but coalesce concurrent callers arriving within
+    ``window`` seconds (up to ``max_batch`` queries) into one such batch.
+
+    With a ``sparse_encoder`` each query is hybrid: Qdrant prefetches
+    ``prefetch_k`` candidates from the dense vector and from the
+    ``sparse_vector_name`` BM25 vector and fuses them with reciprocal rank
+    fusion server-side, so exact API names are found without raising ``k``.
+
+    Documents are built from the ``content_key`` payload field; the rest of
+    the payload becomes their metadata. With ``with_vectors`` the stored dense
+    vector is returned too, as ``metadata["_vector"]``, so callers that need
+    document vectors do not have to embed the chunks again.
+    """
+
+    def __init__(
+        self,
+        client: QdrantClient,
+        collection_name: str,
+        embeddings: Embeddings,
+        k: int = 4,
+        search_params: Optional[models.SearchParams] = None,
+        content_key: str = "text",
+        vector_name: Optional[str] = None,
+        sparse_encoder: Optional[BM25Encoder] = None,
+        sparse_vector_name: str = "bm25",
+        prefetch_k: Optional[int] = None,
+        async_client: Optional[AsyncQdrantClient] = None,
+        window: float = 0.005,
+        max_batch: int = 64,
+        with_vectors: bool = False,
+    ):
+        self.client = client
+        self.async_client = async_client
+        self.collection_name = collection_name
+        self.embeddings = embeddings
+        self.k = k
+        self.search_params = search_params
+        self.content_key = content_key
+        self.vector_name = vector_name
+        self.sparse_encoder = sparse_encoder
+        self.sparse_vector_name = sparse_vector_name
+        self.prefetch_k = prefetch_k
+        self.window = window
+        self.max_batch = max_batch
+        # Only the dense vector, never the sparse one
+        self.with_vectors = [vector_name or ""] if with_vectors else False
+
+        self._queue: "queue.Queue[Tuple[str, int, Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        # Per event loop: queries waiting for the next async flush
+        self._async_pending: Dict[asyncio.AbstractEventLoop, List[tuple]] = {}
+
+    def _requests(self, queries: List[str], vectors: List[List[float]], k: int) -> List[models.QueryRequest]:
+        if self.sparse_encoder is None:
+            return [
+                models.QueryRequest(
+                    query=vector,
+                    using=self.vector_name,
+                    limit=k,
+                    params=self.search_params,
+                    with_payload=True,
+                    with_vector=self.with_vectors,
+                )
+                for vector in vectors
+            ]
+
+        prefetch_k = self.prefetch_k or k * 3
+        return [
+            models.QueryRequest(
+                prefetch=[
+                    models.Prefetch(
+                        query=vector,
+                        using=self.vector_name,
+                        limit=prefetch_k,
+                        params=self.search_params,
+                    ),
+                    models.Prefetch(
+                        query=sparse_vector,
+                        using=self.sparse_vector_name,
+                        limit=prefetch_k,
+                    ),
+                ],
+                query=models.FusionQuery(fusion=models.Fusion.RRF),
+                limit=k,
+                with_payload=True,
+                with_vector=self.with_vectors,
+            )
+            for vector, sparse_vector in zip(vectors, self.sparse_encoder.encode_queries(queries))
+        ]
+
+    def _documents(self, response: models.QueryResponse) -> List[Document]:
+        documents = []
+        for point in response.points:
+            metadata = dict(point.payload or {})
+            page_content = metadata.pop(self.content_key, "")
+            metadata["_id"] = point.id
+            metadata["_score"] = point.score
+            if self.with_vectors and point.vector is not None:
+                vector = point.vector
+                metadata["_vector"] = vector.get(self.vector_name or "") if isinstance(vector, dict) else vector
+            documents.append(Document(page_content=page_content, metadata=metadata))
+        return documents
+
+    def search_batch(self, queries: List[str], k: Optional[int] = None) -> List[List[Document]]:
+        if not queries:
+            return []
+        vectors = embed_queries(self.embeddings, queries)
+        responses = self.client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=self._requests(queries, vectors, k or self.k),
+        )
+        return [self._documents(response) for response in responses]
+
+    async def asearch_batch(self, queries: List[str], k: Optional[int] = None) -> List[List[Document]]:
+        if not queries:
+            return []
+        loop = asyncio.get_running_loop()
+        if self.async_client is None:
+            return await loop.run_in_executor(None, self.search_batch, queries, k)
+        vectors = await loop.run_in_executor(None, embed_queries, self.embeddings, queries)
+        responses = await self.async_client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=self._requests(queries, vectors, k or self.k),
+        )
+        return [self._documents(response) for response in responses]
+
+    # --- Micro-batching for concurrent single-query callers ---
+
+    def _run_worker(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            by_k: Dict[int, list] = {}
+            for item in batch:
+                by_k.setdefault(item[1], []).append(item)
+            for k, items in by_k.items():
+                try:
+                    results = self.search_batch([query for query, _, _ in items], k)
+                except Exception as e:
+                    for _, _, future in items:
+                        future.set_exception(e)
+                    continue
+                for (_, _, future), documents in zip(items, results):
+                    future.set_result(documents)
+
+    def invoke(self, query: str, k: Optional[int] = None) -> List[Document]:
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run_worker, daemon=True)
+                    self._worker.start()
+        future: Future = Future()
+        self._queue.put((query, k or self.k, future))
+        return future.result()
+
+    async def _flush(self, loop: asyncio.AbstractEventLoop):
+        pending = self._async_pending.pop(loop, [])
+        by_k: Dict[int, list] = {}
+        for item in pending:
+            by_k.setdefault(item[1], []).append(item)
+        for k, items in by_k.items():
+            try:
+                results = await self.asearch_batch([query for query, _, _ in items], k)
+            except Exception as e:
+                for _, _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, _, future), documents in zip(items, results):
+                if not future.done():
+                    future.set_result(documents)
+
+    async def ainvoke(self, query: str, k: Optional[int] = None) -> List[Document]:
+        loop = asyncio.get_running_loop()
+        pending = self._async_pending.setdefault(loop, [])
+        future = loop.create_future()
+        pending.append((query, k or self.k, future))
+        if len(pending) == 1:
+            loop.call_later(self.window, lambda: loop.create_task(self._flush(loop)))
+        elif len(pending) >= self.max_batch:
+            loop.create_task(self._flush(loop))
+        return await future
+
+    def as_retriever(self, input_key: str = "input") -> Runnable:
+        """Retriever for ``create_retrieval_chain`` that takes the chain's input dict."""
+        def invoke(inputs: Dict[str, Any]) -> List[Document]:
+            return self.invoke(inputs[input_key])
+
+        async def ainvoke(inputs: Dict[str, Any]) -> List[Document]:
+            return await self.ainvoke(inputs[input_key])
+
+        return RunnableLambda(invoke, afunc=ainvoke)
@@ -0,0 +1,87 @@
+from typing import TYPE_CHECKING, Optional
+import math
+
+import numpy as np
+
+# faiss is imported where it is used, so CLIs can read INDEX_TYPES without loading it
+if TYPE_CHECKING:
+    import faiss
+
+INDEX_TYPES = ["flat", "ivf-flat", "ivf-pq", "hnsw"]
+
+# FAISS wants at least this many training points per IVF centroid
+MIN_POINTS_PER_CENTROID = 39
+
+
+def needs_training(index_type: str) -> bool:
+    return index_type in ("ivf-flat", "ivf-pq")
+
+
+def default_nlist(num_vectors: int) -> int:
+    """Rule of thumb: about 4 * sqrt(n) inverted lists."""
+    return max(1, int(4 * math.sqrt(num_vectors)))
+
+
+def build_index(
+    index_type: str,
+    dim: int,
+    nlist: Optional[int] = None,
+    pq_m: int = 64,
+    hnsw_m: int = 32,
+    train_vectors: Optional[np.ndarray] = None,
+) -> "faiss.Index":
+    """Creates (and trains, for IVF types) an L2 index.
+
+    ``flat``      exact search, cost linear in corpus size
+    ``ivf-flat``  k-means partitions, only ``nprobe`` of them scanned per query
+    ``ivf-pq``    IVF with product-quantized codes (``pq_m`` bytes per vector)
+    ``hnsw``      graph index, no training, tuned with ``efSearch``
+
+    Small training samples get fewer bits per PQ code, since a codebook of
+    ``2**nbits`` centroids needs enough points; when not even a 4-bit one can
+    be trained, ``ivf-pq`` falls back to ``ivf-flat``.
+    """
+    import faiss
+
+    if index_type == "flat":
+        return faiss.IndexFlatL2(dim)
+    if index_type == "hnsw":
+        return faiss.index_factory(dim, f"HNSW{hnsw_m},Flat", faiss.METRIC_L2)
+    if not needs_training(index_type):
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}")
+
+    if train_vectors is None or not len(train_vectors):
+        raise ValueError(f"'{index_type}' needs training vectors")
+    # Never ask for more centroids than the sample can support
+    max_nlist = max(1, len(train_vectors) // MIN_POINTS_PER_CENTROID)
+    nlist = min(nlist or default_nlist(len(train_vectors)), max_nlist)
+
+    codec = "Flat"
+    if index_type == "ivf-pq":
+        nbits = min(8, int(math.log2(max(1, len(train_vectors) // MIN_POINTS_PER_CENTROID))))
+        if nbits >= 4:
+            codec = f"PQ{pq_m}x{nbits}"
+        else:
+            print(f"⚠ {len(train_vectors)} training vectors are too few for ivf-pq, using ivf-flat")
+    index = faiss.index_factory(dim, f"IVF{nlist},{codec}", faiss.METRIC_L2)
+    index.train(np.ascontiguousarray(train_vectors, dtype="float32"))
+    return index
+
+
+def set_search_params(index: "faiss.Index", nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+    """Query-time speed/recall knobs; ignored when they don't apply to the index."""
+    import faiss
+
+    params = faiss.ParameterSpace()
+    if nprobe is not None and "IVF" in type(faiss.downcast_index(index)).__name__:
+        params.set_index_parameter(index, "nprobe", nprobe)
+    if ef_search is not None and "HNSW" in type(faiss.downcast_index(index)).__name__:
+        params.set_index_parameter(index, "efSearch", ef_search)
+
+
+def recall_at_k(index: "faiss.Index", exact: "faiss.Index", queries: np.ndarray, k: int) -> float:
+    """Share of the exact top-k neighbours that ``index`` also returns."""
+    _, expected = exact.search(queries, k)
+    _, found = index.search(queries, k)
+    hits = sum(len(set(e) & set(f)) for e, f in zip(expected.tolist(), found.tolist()))
+    return hits / (len(queries) * k)
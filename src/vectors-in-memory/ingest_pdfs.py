@@ -0,0 +1,145 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, List, Tuple
+import argparse
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+# Make the shared modules under src/ importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from index_factory import INDEX_TYPES
+from parallel.pool import pool_context
+
+# Workers re-import this module when processes are spawned, so LangChain and
+# FAISS are only imported where they are used
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+load_dotenv()
+
+
+def page_count(path: str) -> int:
+    """Number of pages, read from the PDF's page tree without extracting text."""
+    import pymupdf
+
+    with pymupdf.open(path) as pdf:
+        return pdf.page_count
+
+
+def split_pages(
+    path: str, start: int, end: int, chunk_size: int, chunk_overlap: int
+) -> List["Document"]:
+    """Extracts and splits pages ``start`` to ``end - 1`` of a PDF."""
+    import pymupdf
+    from langchain_core.documents import Document
+    from langchain_text_splitters import CharacterTextSplitter
+
+    text_splitter = CharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separator="\n",
+    )
+    chunks = []
+    with pymupdf.open(path) as pdf:
+        for number in range(start, end):
+            # Same metadata keys PyMuPDFLoader uses for a page
+            page = Document(
+                page_content=pdf[number].get_text(),
+                metadata={"source": path, "file_path": path, "page": number, "total_pages": pdf.page_count},
+            )
+            chunks.extend(text_splitter.split_documents([page]))
+    return chunks
+
+
+def page_ranges(paths: List[str], pages_per_task: int) -> Iterator[Tuple[str, int, int, bool]]:
+    """``(path, start, end, last range of the file)`` for every PDF; unreadable files are skipped."""
+    for path in paths:
+        try:
+            pages = page_count(path)
+        except Exception as e:
+            print(f"❌ Error opening {Path(path).name}: {e}")
+            continue
+        for start in range(0, pages, pages_per_task):
+            end = min(start + pages_per_task, pages)
+            yield path, start, end, end == pages
+
+
+def iter_chunks(
+    paths: List[str],
+    workers: int,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    pages_per_task: int = 16,
+) -> Iterator["Document"]:
+    """Parses PDFs across a process pool and yields their chunks in file order.
+
+    Each task covers ``pages_per_task`` pages of one file and only
+    ``2 * workers`` tasks are in flight at once, so memory is bounded by the
+    pages being parsed, not by the size of the files or of the directory.
+    """
+    # main() has loaded the embedding model (torch) by now, so workers must not be forked
+    with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context()) as pool:
+        pending = deque()
+        file_chunks = 0
+
+        def collect():
+            nonlocal file_chunks
+            path, start, end, last, future = pending.popleft()
+            try:
+                chunks = future.result()
+            except Exception as e:
+                print(f"❌ Error parsing pages {start + 1}-{end} of {Path(path).name}: {e}")
+                chunks = []
+            file_chunks += len(chunks)
+            if last:
+                print(f"📄 {Path(path).name}: {file_chunks} chunks")
+                file_chunks = 0
+            return chunks
+
+        for path, start, end, last in page_ranges(paths, pages_per_task):
+            future = pool.submit(split_pages, path, start, end, chunk_size, chunk_overlap)
+            pending.append((path, start, end, last, future))
+            if len(pending) >= workers * 2:
+                yield from collect()
+        while pending:
+            yield from collect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest a directory of PDFs into one FAISS index.")
+    parser.add_argument("pdf_dir", help="directory searched recursively for *.pdf")
+    parser.add_argument("--output", default="faiss_index_react")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--pages-per-task", type=int, default=16, help="pages parsed per worker task")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="flat")
+    args = parser.parse_args()
+
+    paths = sorted(str(path) for path in Path(args.pdf_dir).rglob("*.pdf"))
+    if not paths:
+        print(f"❌ No PDFs found in {args.pdf_dir}")
+        return
+    print(f"⏳ Ingesting {len(paths)} PDFs with {args.workers} worker(s)...")
+
+    from embeddings.cached import load_embeddings
+    import mmap_store
+
+    start = time.perf_counter()
+    count = mmap_store.save(
+        iter_chunks(paths, args.workers, args.chunk_size, args.chunk_overlap, args.pages_per_task),
+        load_embeddings(),
+        args.output,
+        index_type=args.index_type,
+    )
+    elapsed = time.perf_counter() - start
+    print(f"✅ Indexed {count} chunks from {len(paths)} PDFs in {elapsed:.1f}s ({count / elapsed:.1f} chunks/s)")
+
+
+if __name__ == "__main__":
+    main()
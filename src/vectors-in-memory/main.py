@@ -1,12 +1,20 @@
 from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_text_splitters import CharacterTextSplitter
-from langchain_community.vectorstores import FAISS
 from langchain_groq import ChatGroq
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain import hub
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain.chains.retrieval import create_retrieval_chain
 from dotenv import load_dotenv
+import os
+import sys
+
+# Make the shared modules under src/ importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embeddings.cached import load_embeddings
+from prompts.registry import load_prompt
+from caching.semantic import SemanticCache
+
+import mmap_store
 
 load_dotenv()
 
@@ -24,19 +32,22 @@ if __name__=="__main__":
     )
     docs = text_splitter.split_documents(documents=documents)
     
-    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-mpnet-base-v2")
-    vectorStore = FAISS.from_documents(docs, embeddings)
-    vectorStore.save_local("faiss_index_react")
+    embeddings = load_embeddings()
+    # flat (exact), ivf-flat, ivf-pq or hnsw
+    index_type = os.getenv("FAISS_INDEX_TYPE", "flat")
+    mmap_store.save(docs, embeddings, "faiss_index_react", index_type=index_type)
     
-    new_vectorStore = FAISS.load_local(
-        "faiss_index_react", 
-        embeddings, 
-        allow_dangerous_deserialization=True
+    # Memory-mapped index + lazily read documents, no pickle involved
+    new_vectorStore = mmap_store.load(
+        "faiss_index_react",
+        embeddings,
+        nprobe=int(os.getenv("FAISS_NPROBE", "16")),
+        ef_search=int(os.getenv("FAISS_EF_SEARCH", "64")),
     )
     
     llm = ChatGroq(model_name="mixtral-8x7b-32768")
     
-    retrieval_qa_chat_prompt = hub.pull("langchain-ai/retrieval-qa-chat")
+    retrieval_qa_chat_prompt = load_prompt("langchain-ai/retrieval-qa-chat")
     combine_docs_chain = create_stuff_documents_chain(
         llm, 
         retrieval_qa_chat_prompt
@@ -48,7 +59,15 @@ if __name__=="__main__":
     
     
     
+    # Reuse answers to near-identical questions from earlier runs
+    semantic_cache = SemanticCache(
+        embeddings, path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "semantic_cache.json")
+    )
+    retrival_chain = semantic_cache.wrap(retrival_chain)
+    
     result = retrival_chain.invoke(input={"input": 'Give me the gist of Transformer in 3 sentences'})
+    semantic_cache.save()
+    print(semantic_cache.stats())
 
     print(result['answer'])
     
\ No newline at end of file
@@ -0,0 +1,194 @@
+from typing import Iterable, List, Optional, Union
+import json
+import os
+import threading
+
+import faiss
+import numpy as np
+from langchain_community.docstore.base import Docstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from index_factory import build_index, needs_training, set_search_params
+
+INDEX_FILE = "index.faiss"
+DOCS_FILE = "docs.jsonl"
+OFFSETS_FILE = "docs.offsets"
+# Vectors waiting for the IVF training sample to be complete
+SPOOL_FILE = "vectors.spool"
+
+
+class OffsetDocstore(Docstore):
+    """Read-only docstore backed by a JSONL file and a byte-offset table.
+
+    Row ``i`` of the FAISS index is line ``i`` of ``docs.jsonl``; its start
+    offset is entry ``i`` of the memory-mapped ``docs.offsets`` (uint64), so
+    a document is read from disk only when a search returns it.
+    """
+
+    def __init__(self, folder_path: str):
+        self._offsets = np.memmap(os.path.join(folder_path, OFFSETS_FILE), dtype="<u8", mode="r")
+        self._file = open(os.path.join(folder_path, DOCS_FILE), "rb")
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def search(self, search: Union[str, int]) -> Union[str, Document]:
+        row = int(search)
+        if not 0 <= row < len(self._offsets):
+            return f"ID {search} not found."
+        record = json.loads(self._read_line(int(self._offsets[row])))
+        return Document(page_content=record["page_content"], metadata=record["metadata"])
+
+    def _read_line(self, start: int) -> bytes:
+        # Searches may run concurrently, so never share the file position
+        with self._lock:
+            self._file.seek(start)
+            return self._file.readline()
+
+    def close(self):
+        self._file.close()
+
+
+class _RowIds:
+    """Identity mapping FAISS row -> docstore id, without a per-row dict."""
+
+    def __init__(self, size: int):
+        self._size = size
+
+    def __getitem__(self, row: int) -> int:
+        if not 0 <= row < self._size:
+            raise KeyError(row)
+        return row
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, row) -> bool:
+        # FAISS hands back numpy integers
+        return isinstance(row, (int, np.integer)) and 0 <= row < self._size
+
+    def get(self, row, default=None):
+        return row if row in self else default
+
+    def values(self):
+        return range(self._size)
+
+
+def save(
+    documents: Iterable[Document],
+    embeddings: Embeddings,
+    folder_path: str,
+    batch_size: int = 256,
+    index_type: str = "flat",
+    train_size: int = 20000,
+    seed: int = 0,
+    **index_options,
+) -> int:
+    """Embeds documents into a FAISS index and writes it with an offset-indexed
+    docstore. Returns the document count.
+
+    ``index_type`` is one of ``index_factory.INDEX_TYPES``; IVF indexes are
+    trained on a uniform (reservoir) sample of ``train_size`` vectors. Their
+    vectors are spooled to a temporary file until training is done, so RAM
+    stays at the sample size. ``index_options`` go to
+    ``index_factory.build_index``.
+    """
+    os.makedirs(folder_path, exist_ok=True)
+    index = None
+    offsets = []
+    training = needs_training(index_type)
+    spool_path = os.path.join(folder_path, SPOOL_FILE)
+    spool = open(spool_path, "wb") if training else None
+    reservoir = None
+    seen = 0
+    rng = np.random.default_rng(seed)
+
+    def add(vectors: np.ndarray):
+        nonlocal index, reservoir, seen
+        if not training:
+            if index is None:
+                index = build_index(index_type, vectors.shape[1], **index_options)
+            index.add(vectors)
+            return
+        spool.write(vectors.tobytes())
+        if reservoir is None:
+            reservoir = np.empty((train_size, vectors.shape[1]), dtype="float32")
+        for vector in vectors:
+            # Algorithm R: every vector ends up in the sample with equal probability
+            slot = seen if seen < train_size else rng.integers(0, seen + 1)
+            if slot < train_size:
+                reservoir[slot] = vector
+            seen += 1
+
+    with open(os.path.join(folder_path, DOCS_FILE), "wb") as docs_file:
+        def flush(batch: List[Document]):
+            add(np.asarray(embeddings.embed_documents([doc.page_content for doc in batch]), dtype="float32"))
+            for doc in batch:
+                offsets.append(docs_file.tell())
+                record = {"page_content": doc.page_content, "metadata": doc.metadata}
+                docs_file.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+
+        batch = []
+        for doc in documents:
+            batch.append(doc)
+            if len(batch) == batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+
+    if training:
+        spool.close()
+        try:
+            if seen:
+                sample = reservoir[:min(seen, train_size)]
+                print(f"🏋 Training {index_type} index on {len(sample)} of {seen} vectors...")
+                index = build_index(index_type, sample.shape[1], train_vectors=sample, **index_options)
+                spooled = np.memmap(spool_path, dtype="float32", mode="r", shape=(seen, sample.shape[1]))
+                for start in range(0, seen, 65536):
+                    index.add(np.ascontiguousarray(spooled[start:start + 65536]))
+                del spooled
+        finally:
+            os.remove(spool_path)
+
+    if index is None:
+        raise ValueError("No documents to index")
+    faiss.write_index(index, os.path.join(folder_path, INDEX_FILE))
+    np.asarray(offsets, dtype="<u8").tofile(os.path.join(folder_path, OFFSETS_FILE))
+    return index.ntotal
+
+
+def load(
+    folder_path: str,
+    embeddings: Embeddings,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+) -> FAISS:
+    """Opens a saved store without reading the index or documents into RAM.
+
+    The index is memory-mapped (zero-copy for flat indexes on FAISS builds that
+    support ``IO_FLAG_MMAP_IFC``) and nothing is unpickled. ``nprobe`` (IVF)
+    and ``ef_search`` (HNSW) trade recall for query speed. IVF indexes get a
+    direct map (8 bytes per vector in RAM) so MMR search can reconstruct
+    vectors by row.
+    """
+    flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+    index = faiss.read_index(os.path.join(folder_path, INDEX_FILE), flags)
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    set_search_params(index, nprobe=nprobe, ef_search=ef_search)
+    docstore = OffsetDocstore(folder_path)
+    if index.ntotal != len(docstore):
+        raise ValueError(
+            f"Index has {index.ntotal} vectors but docstore has {len(docstore)} documents in {folder_path}"
+        )
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=_RowIds(index.ntotal),
+    )